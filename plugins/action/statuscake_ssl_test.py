@@ -0,0 +1,13 @@
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    SSL_TEST_ARGUMENT_SPEC,
+    SSLTest,
+)
+from ansible_collections.caktus.hosting_services.plugins.plugin_utils.statuscake import (
+    StatusCakeAction,
+)
+
+
+class ActionModule(StatusCakeAction):
+
+    test_class = SSLTest
+    argument_spec = SSL_TEST_ARGUMENT_SPEC
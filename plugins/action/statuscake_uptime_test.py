@@ -0,0 +1,13 @@
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    UPTIME_TEST_ARGUMENT_SPEC,
+    UptimeTest,
+)
+from ansible_collections.caktus.hosting_services.plugins.plugin_utils.statuscake import (
+    StatusCakeAction,
+)
+
+
+class ActionModule(StatusCakeAction):
+
+    test_class = UptimeTest
+    argument_spec = UPTIME_TEST_ARGUMENT_SPEC
@@ -0,0 +1,202 @@
+import csv
+import json
+import math
+import time
+from collections import defaultdict
+
+from ansible.plugins.callback import CallbackBase
+
+DOCUMENTATION = """
+    name: task_timing
+    type: aggregate
+    short_description: Report the time each host spends on each task and loop item
+    description:
+      - Times every task on every host, and each of its loop items, and counts
+        their retries ("until"), as seen by the controller.
+      - At the end of the playbook, summarizes the durations (total, p50, p95 and
+        max) of each role and task across hosts, and writes them, with every
+        timing, to a JSON or CSV report.
+    requirements:
+      - enable in configuration, e.g. callbacks_enabled = caktus.hosting_services.task_timing
+    options:
+      output:
+        description:
+          - File to write the report to. A .csv file gets one row per host and
+            task, and per loop item; anything else gets JSON.
+        default: task_timing.json
+        type: path
+        env:
+          - name: TASK_TIMING_OUTPUT
+        ini:
+          - section: callback_task_timing
+            key: output
+"""
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(len(values) * percent / 100))
+    return values[rank - 1]
+
+
+def summarize(timings):
+    """Total and percentiles of the durations of timings"""
+    durations = sorted(timing["duration"] for timing in timings)
+    return {
+        "count": len(durations),
+        "total": round(sum(durations), 3),
+        "p50": percentile(durations, 50),
+        "p95": percentile(durations, 95),
+        "max": durations[-1] if durations else None,
+        "retries": sum(timing["retries"] for timing in timings),
+    }
+
+
+class CallbackModule(CallbackBase):
+    """
+    Time tasks per host, and their loop items, for a report of where a
+    fleet-wide run spends its time.
+    """
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "caktus.hosting_services.task_timing"
+    CALLBACK_NEEDS_ENABLED = True
+
+    CSV_FIELDS = (
+        "host",
+        "play",
+        "role",
+        "task",
+        "item",
+        "status",
+        "duration",
+        "retries",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.started = time.monotonic()
+        self.play = None
+        # (host, task uuid) -> timing, in the order tasks started
+        self.timings = {}
+        # when each (host, task) started, and last started a loop item
+        self.starts = {}
+        self.marks = {}
+        self.retries = defaultdict(int)
+
+    @staticmethod
+    def key(host, task):
+        return host.get_name(), task._uuid
+
+    def v2_playbook_on_play_start(self, play):
+        self.play = play.get_name()
+
+    def v2_runner_on_start(self, host, task):
+        key = self.key(host, task)
+        self.starts[key] = self.marks[key] = time.monotonic()
+        self.timings[key] = {
+            "host": host.get_name(),
+            "play": self.play,
+            "role": task._role.get_name() if task._role else "",
+            "task": task.get_name(),
+            "status": None,
+            "duration": None,
+            "retries": 0,
+            "items": [],
+        }
+
+    def finish(self, result, status):
+        key = self.key(result._host, result._task)
+        if key not in self.starts:
+            return
+        timing = self.timings[key]
+        timing["status"] = status
+        timing["duration"] = round(time.monotonic() - self.starts.pop(key), 3)
+        timing["retries"] = self.retries.pop(key, 0)
+        self.marks.pop(key, None)
+
+    def item(self, result, status):
+        key = self.key(result._host, result._task)
+        if key not in self.marks:
+            return
+        now = time.monotonic()
+        self.timings[key]["items"].append(
+            {
+                "item": self._get_item_label(result._result),
+                "status": status,
+                "duration": round(now - self.marks[key], 3),
+            }
+        )
+        self.marks[key] = now
+
+    def v2_runner_retry(self, result):
+        self.retries[self.key(result._host, result._task)] += 1
+
+    def v2_runner_on_ok(self, result):
+        self.finish(result, "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self.finish(result, "failed")
+
+    def v2_runner_on_skipped(self, result):
+        self.finish(result, "skipped")
+
+    def v2_runner_on_unreachable(self, result):
+        self.finish(result, "unreachable")
+
+    def v2_runner_item_on_ok(self, result):
+        self.item(result, "ok")
+
+    def v2_runner_item_on_failed(self, result):
+        self.item(result, "failed")
+
+    def v2_runner_item_on_skipped(self, result):
+        self.item(result, "skipped")
+
+    def report(self):
+        timings = [t for t in self.timings.values() if t["duration"] is not None]
+        by_role = defaultdict(list)
+        by_task = defaultdict(list)
+        for timing in timings:
+            by_role[timing["role"]].append(timing)
+            by_task[(timing["role"], timing["task"])].append(timing)
+        return {
+            "elapsed": round(time.monotonic() - self.started, 3),
+            "roles": {role: summarize(group) for role, group in by_role.items()},
+            "tasks": [
+                {"role": role, "task": task, **summarize(group)}
+                for (role, task), group in by_task.items()
+            ],
+            "timings": timings,
+        }
+
+    def write(self, report, path):
+        with open(path, "w", newline="") as f:
+            if not path.endswith(".csv"):
+                json.dump(report, f, indent=1)
+                return
+            writer = csv.DictWriter(f, self.CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for timing in report["timings"]:
+                writer.writerow(dict(timing, item=""))
+                for item in timing["items"]:
+                    writer.writerow(dict(timing, retries="", **item))
+
+    def v2_playbook_on_stats(self, stats):
+        report = self.report()
+        path = self.get_option("output")
+        self.write(report, path)
+        self._display.banner("TASK TIMING")
+        slowest = sorted(
+            report["roles"].items(), key=lambda role: role[1]["total"], reverse=True
+        )
+        for role, summary in slowest:
+            self._display.display(
+                f"{role or '(no role)'}: {summary['total']}s over {summary['count']}"
+                f" tasks (p50 {summary['p50']}s, p95 {summary['p95']}s,"
+                f" max {summary['max']}s, {summary['retries']} retries)"
+            )
+        self._display.display(f"Task timings written to {path}")
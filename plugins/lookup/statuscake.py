@@ -0,0 +1,61 @@
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    ListingCache,
+    LogSink,
+)
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake_bulk import (
+    list_tests,
+)
+from ansible_collections.caktus.hosting_services.plugins.plugin_utils.statuscake import (
+    _snapshot,
+    shared_client,
+)
+
+
+class LookupModule(LookupBase):
+    """
+    Return every StatusCake test of the types given as terms (uptime and
+    ssl by default), each with its "type", e.g.:
+
+        query("caktus.hosting_services.statuscake", "uptime",
+              api_key=statuscake_api_key, tags=["prod"])
+
+    Uptime listings are filtered by tags server side. Like the statuscake_*
+    tasks, listings are cached on disk for cache_ttl seconds, or else
+    fetched once per worker process, unless filtered: our own writes don't
+    keep a filtered listing current, so with tags they're fetched each time.
+    """
+
+    def run(self, terms, variables=None, api_key=None, tags=(), cache_ttl=0, **kwargs):
+        if not api_key:
+            raise AnsibleError("The statuscake lookup needs an api_key")
+        test_types = terms or ["uptime", "ssl"]
+        unknown = set(test_types) - {"uptime", "ssl"}
+        if unknown:
+            raise AnsibleError(f"Unknown StatusCake test types: {', '.join(unknown)}")
+        if isinstance(tags, str):
+            tags = [tags]
+        if int(cache_ttl):
+            cache = ListingCache(int(cache_ttl))
+        else:
+            cache = None if tags else _snapshot
+        try:
+            tests, status = list_tests(
+                api_key=api_key,
+                test_types=test_types,
+                tags=tags,
+                client=shared_client(api_key),
+                cache=cache,
+            )
+        finally:
+            # the worker exits without running atexit handlers
+            LogSink.close_all()
+        if not status.success:
+            raise AnsibleError(status.message)
+        return [
+            dict(test, type=test_type)
+            for test_type in test_types
+            for test in tests[test_type]
+        ]
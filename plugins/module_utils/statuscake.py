@@ -1,43 +1,144 @@
+# Every loop item of the modules imports this, so only cheap standard library
+# modules are imported up front. requests, and the modules only some features
+# need, are imported where they're used. BulkSync (statuscake_bulk.py), the
+# uptime history exports (statuscake_export.py) and the CLI (statuscake_cli.py)
+# live in modules of their own.
+import fcntl
+import hashlib
+import json
 import logging
-import requests
-import yaml
-import sys
-import argparse
-from dataclasses import dataclass
-import http.client
+import math
+import os
+import random
+import re
+import stat
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
 
 logger = logging.getLogger("statuscake")
-httpclient_logger = logging.getLogger("http.client")
 
 
-def httpclient_logging_patch(level=logging.DEBUG):
+TRUE_STRINGS = ("true", "yes", "on", "1")
+
+
+def normalize(value, like, as_set=False, url=False):
     """
-    Enable HTTPConnection debug logging to the logging framework, so that
-    request.post() body and headers can be emitted to out log file.
-    Adapted from: https://stackoverflow.com/a/16337639/277364
+    Coerce value to the type of like, so that an API response value and a
+    module option compare by meaning rather than by representation.
     """
+    if value is None:
+        return None
+    if isinstance(like, bool):
+        if isinstance(value, str):
+            return value.lower() in TRUE_STRINGS
+        return bool(value)
+    if isinstance(like, int):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return value
+    if isinstance(like, (list, tuple)):
+        if not isinstance(value, (list, tuple)):
+            value = str(value).split(",") if value != "" else []
+        items = [str(item) for item in value]
+        return frozenset(items) if as_set else items
+    value = str(value)
+    return value.rstrip("/") if url else value
+
 
-    def httpclient_log(*args):
-        httpclient_logger.log(level, " ".join(args))
+def diff_fields(current, desired, set_fields=(), url_fields=()):
+    """
+    Compare desired values (in the API's response schema) with a remote
+    record and return {field: {"old": ..., "new": ...}} for every field
+    that still differs once both sides are normalized.
+    """
+    diff = {}
+    for key, new in desired.items():
+        old = current.get(key)
+        # StatusCake answers with booleans where some options are strings
+        like = True if isinstance(old, bool) else new
+        options = {"as_set": key in set_fields, "url": key in url_fields}
+        if normalize(old, like, **options) != normalize(new, like, **options):
+            diff[key] = {"old": old, "new": new}
+    return diff
 
-    # mask the print() built-in in the http.client module to use
-    # logging instead
-    http.client.print = httpclient_log
-    # enable debugging
-    http.client.HTTPConnection.debuglevel = 1
 
+# Per-test module options, shared by the single-test modules and the bulk
+# statuscake_tests module (which validates each list item against them).
+UPTIME_TEST_ARGUMENT_SPEC = {
+    "state": {"required": True, "type": "str", "choices": ["present", "absent"]},
+    "name": {"required": True, "type": "str"},
+    "test_type": {
+        "required": True,
+        "type": "str",
+        "choices": ["DNS", "HEAD", "HTTP", "PING", "SSH", "TCP"],
+    },
+    "website_url": {"required": True, "type": "str"},
+    "check_rate": {
+        "required": True,
+        "type": "int",
+        "choices": [0, 30, 60, 300, 900, 1800, 3600, 86400],
+    },
+    "basic_username": {"required": False, "type": "str"},
+    "basic_password": {"required": False, "type": "str", "no_log": True},
+    "confirmation": {"required": False, "type": "int"},
+    "contact_groups": {"required": False, "type": "list"},
+    "custom_header": {"required": False, "type": "str"},
+    "do_not_find": {"required": False, "type": "bool"},
+    "dns_ip": {"required": False, "type": "list"},
+    "dns_server": {"required": False, "type": "str"},
+    "enable_ssl_alert": {"required": False, "type": "bool"},
+    "final_endpoint": {"required": False, "type": "str"},
+    "find_string": {"required": False, "type": "str"},
+    "follow_redirects": {"required": False, "type": "str"},
+    "host": {"required": False, "type": "str"},
+    "include_header": {"required": False, "type": "bool"},
+    "paused": {"required": False, "type": "bool"},
+    "port": {"required": False, "type": "int"},
+    "post_body": {"required": False, "type": "str"},
+    "post_raw": {"required": False, "type": "str"},
+    "regions": {"required": False, "type": "list"},
+    "status_codes": {"required": False, "type": "list"},
+    "tags": {"required": False, "type": "list"},
+    "timeout": {"required": False, "type": "int"},
+    "trigger_rate": {"required": False, "type": "int"},
+    "use_jar": {"required": False, "type": "str"},
+    "user_agent": {"required": False, "type": "str"},
+}
 
-def flatten(obj):
-    flat = set()
-    for key, val in obj.items():
-        flat.add((key, str(val)))
-    return flat
+SSL_TEST_ARGUMENT_SPEC = {
+    "state": {"required": True, "type": "str", "choices": ["present", "absent"]},
+    "website_url": {"required": True, "type": "str"},
+    "check_rate": {
+        "required": True,
+        "type": "int",
+        "choices": [300, 600, 1800, 86400, 2073600],
+    },
+    "contact_groups": {"required": False, "type": "list"},
+    "alert_at": {"required": True, "type": "list"},
+    "alert_reminder": {"required": True, "type": "bool"},
+    "alert_expiry": {"required": True, "type": "bool"},
+    "alert_broken": {"required": True, "type": "bool"},
+    "alert_mixed": {"required": True, "type": "bool"},
+    "follow_redirects": {"required": False, "type": "bool"},
+    "paused": {"required": False, "type": "bool"},
+    "hostname": {"required": False, "type": "str"},
+    "user_agent": {"required": False, "type": "str"},
+}
 
 
-def dic_difference(dic1, dic2):
-    set_pre = set(flatten(dic1))
-    set_post = set(flatten(dic2))
-    return set_pre ^ set_post
+# Options of every statuscake_* module, besides those of the tests themselves
+CONNECTION_ARGUMENT_SPEC = {
+    "api_key": {"required": True, "type": "str", "no_log": True},
+    "log_file": {"required": False, "type": "str"},
+    "cache_ttl": {"required": False, "type": "int", "default": 0},
+    "metrics_file": {"required": False, "type": "path"},
+    "journal_file": {"required": False, "type": "path"},
+}
 
 
 @dataclass
@@ -45,6 +146,610 @@ class Status:
     success: bool = False
     changed: bool = False
     message: str = ""
+    # "create", "update", "delete" or "none"
+    action: str = ""
+    # field-level changes, as {field: {"old": ..., "new": ...}}
+    diff: dict = field(default_factory=dict)
+
+    def result(self):
+        """Module return values for this status"""
+        result = {
+            "changed": self.changed,
+            "msg": self.message,
+            "action": self.action,
+            "changes": self.diff,
+        }
+        if self.diff:
+            # shown by ansible-playbook --diff
+            result["diff"] = {
+                "before": {key: change["old"] for key, change in self.diff.items()},
+                "after": {key: change["new"] for key, change in self.diff.items()},
+            }
+        return result
+
+
+class RateLimiter:
+    """
+    Token bucket pacing requests to StatusCake. It also honours the API's
+    rate-limit headers and counts retries and throttling, for logging.
+    https://developers.statuscake.com/guides/api/ratelimiting/
+    """
+
+    def __init__(self, rate=4.0, burst=4):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # the API told us to stop until this (monotonic) time
+        self.resume_at = 0.0
+        self.lock = threading.Lock()
+        self.sleep = time.sleep
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self.updated
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            self.requests += 1
+            wait = max(-self.tokens / self.rate, self.resume_at - now, 0)
+            if wait:
+                self.throttled += 1
+                self.throttled_seconds += wait
+        if wait:
+            logger.debug("Pacing StatusCake requests, waiting %.2fs", wait)
+            self.sleep(wait)
+
+    def update(self, headers):
+        """Pause every request until the window resets once none remain"""
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset = float(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        if remaining <= 0:
+            with self.lock:
+                self.resume_at = max(self.resume_at, time.monotonic() + reset)
+
+    def backoff(self, delay):
+        """Wait before retrying a request"""
+        with self.lock:
+            self.retries += 1
+            self.throttled_seconds += delay
+        self.sleep(delay)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+        }
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(len(values) * percent / 100))
+    return values[rank - 1]
+
+
+class RequestMetrics:
+    """
+    Timing and size of every call made through StatusCakeAPI._request,
+    summarized for module results and optionally appended to a JSON-lines
+    file as they happen.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.calls = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def path_template(path):
+        """/v1/uptime/123 -> /v1/uptime/{id}, so calls group by endpoint"""
+        return re.sub(r"/\d+(?=/|$)", "/{id}", path)
+
+    def record(self, method, path, status, latency, size, retries):
+        call = {
+            "method": method.upper(),
+            "path": self.path_template(path),
+            "status": status,
+            "latency": round(latency, 4),
+            "bytes": size,
+            "retries": retries,
+        }
+        with self.lock:
+            self.calls.append(call)
+            if self.sink:
+                with open(self.sink, "a") as f:
+                    f.write(json.dumps(dict(call, time=time.time())) + "\n")
+
+    def summary(self):
+        with self.lock:
+            calls = list(self.calls)
+        latencies = sorted(call["latency"] for call in calls)
+        return {
+            "calls": len(calls),
+            "retries": sum(call["retries"] for call in calls),
+            "bytes": sum(call["bytes"] for call in calls),
+            "latency_total": round(sum(latencies), 4),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "by_endpoint": dict(
+                Counter(f"{call['method']} {call['path']}" for call in calls)
+            ),
+            "by_status": dict(Counter(call["status"] for call in calls)),
+        }
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Log records as JSON objects, with their `extra` fields, and with API
+    keys redacted. (Request data is redacted before it's logged; see
+    StatusCakeAPI.redacted().)
+    """
+
+    secrets = re.compile(r"(Bearer\s+)\S+")
+    # attributes every LogRecord has, so the others came from `extra`
+    standard = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+        "message",
+        "asctime",
+    }
+
+    def redact(self, value):
+        return self.secrets.sub(r"\1***", value) if isinstance(value, str) else value
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": self.redact(record.getMessage()),
+        }
+        for key, val in vars(record).items():
+            if key not in self.standard:
+                entry[key] = self.redact(val)
+        if record.exc_info:
+            entry["exception"] = self.redact(self.formatException(record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class LogSink:
+    """
+    A size-bounded, rotating JSON-lines log file for the statuscake logger.
+    Records are queued and written by a background thread, so requests
+    don't wait on the disk, and other loggers (and other HTTP clients in
+    the process) are left alone. One sink per path, shared by every test.
+
+    Sinks are closed at exit, but Ansible's forked workers end with
+    os._exit(), so plugins running there must call close_all() themselves.
+    """
+
+    MAX_BYTES = 10 * 2**20
+    BACKUPS = 3
+    sinks = {}
+    lock = threading.Lock()
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        import logging.handlers
+        import queue
+
+        self.path = path
+        self.pid = os.getpid()
+        self.closed = False
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, delay=True
+        )
+        file_handler.setFormatter(JSONFormatter())
+        log_queue = queue.SimpleQueue()
+        self.handler = logging.handlers.QueueHandler(log_queue)
+        self.listener = logging.handlers.QueueListener(log_queue, file_handler)
+        self.listener.start()
+        logger.addHandler(self.handler)
+        if logger.level == logging.NOTSET:
+            logger.setLevel(logging.DEBUG)
+
+    @classmethod
+    def open(cls, path):
+        """The sink writing to path, started on first use"""
+        path = os.path.abspath(path)
+        with cls.lock:
+            inherited = cls.sinks.get(path)
+            if inherited and inherited.pid != os.getpid():
+                # forked from the process that opened it: its writer thread
+                # didn't come along, so start over
+                logger.removeHandler(inherited.handler)
+                del cls.sinks[path]
+            if path not in cls.sinks:
+                import atexit
+
+                cls.sinks[path] = cls(path)
+                atexit.register(cls.sinks[path].close)
+            return cls.sinks[path]
+
+    @classmethod
+    def close_all(cls):
+        """Close every sink this process opened"""
+        with cls.lock:
+            sinks = [sink for sink in cls.sinks.values() if sink.pid == os.getpid()]
+        for sink in sinks:
+            sink.close()
+
+    def close(self):
+        """Write out the queued records, and stop"""
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            if self.sinks.get(self.path) is self:
+                del self.sinks[self.path]
+        logger.removeHandler(self.handler)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+@contextmanager
+def locked(path):
+    """Hold an exclusive lock on path, shared with other processes (forks)"""
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class ListingCache:
+    """
+    Listings of StatusCake tests cached on disk, in a file per API key and
+    endpoint, so consecutive module runs don't each list the whole account.
+
+    Pruning trusts these listings, so the directory (the user's cache
+    directory by default) must be private: if it's anyone else's, or
+    others may write to it, the cache isn't used.
+    """
+
+    def __init__(self, ttl, directory=None):
+        self.ttl = ttl
+        if directory is None:
+            directory = os.path.join(
+                os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                "ansible-statuscake",
+            )
+        self.directory = directory
+        self.private = self.make_private(directory)
+
+    @staticmethod
+    def make_private(directory):
+        """Create directory for our use only, or check that it is"""
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            info = os.lstat(directory)
+        except OSError as e:
+            logger.warning("Not caching StatusCake listings: %s", e)
+            return False
+        if (
+            not stat.S_ISDIR(info.st_mode)
+            or info.st_uid != os.getuid()
+            or info.st_mode & 0o077
+        ):
+            logger.warning(
+                "Not caching StatusCake listings: %s isn't a directory only"
+                " its owner (this user) can use",
+                directory,
+            )
+            return False
+        return True
+
+    def path(self, api_key, endpoint):
+        digest = hashlib.sha256(f"{api_key} {endpoint}".encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def read(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, path, data):
+        import tempfile
+
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.directory, delete=False, suffix=".tmp"
+        ) as f:
+            json.dump(data, f)
+        os.replace(f.name, path)
+
+    def get_or_fetch(self, api_key, endpoint, fetch):
+        """
+        Return the cached listing while it's fresh, otherwise call fetch()
+        and cache its result (unless it's None). Other processes wait for
+        the fetch rather than listing the account at the same time.
+        """
+        if not self.private:
+            return fetch()
+        path = self.path(api_key, endpoint)
+        with locked(path):
+            data = self.read(path)
+            if data and time.time() - data["fetched_at"] <= self.ttl:
+                logger.debug("Using cached listing of %s", endpoint)
+                return data["records"]
+            records = fetch()
+            if records is not None:
+                self.write(path, {"fetched_at": time.time(), "records": records})
+            return records
+
+    def invalidate(self, api_key, endpoint):
+        if not self.private:
+            return
+        path = self.path(api_key, endpoint)
+        with locked(path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def replace(self, api_key, endpoint, test_id, record):
+        """Apply one of our own writes to a cached listing (None deletes)"""
+        if not self.private:
+            return
+        path = self.path(api_key, endpoint)
+        with locked(path):
+            data = self.read(path)
+            if data is None:
+                return
+            data["records"] = [
+                test for test in data["records"] if str(test["id"]) != str(test_id)
+            ]
+            if record is not None:
+                data["records"].append(record)
+            self.write(path, data)
+
+    def created(self, api_key, endpoint, test_id, record):
+        """
+        A test we created. StatusCake fills in fields we didn't send, so
+        the listing is fetched again next time rather than cached as sent.
+        """
+        self.invalidate(api_key, endpoint)
+
+
+class Journal:
+    """
+    Fingerprints of the config we last applied to each test, and of the
+    test as listed afterwards, in a JSON file. A test whose config and
+    listing both still match needn't be fetched or compared again. Updates
+    are kept in memory until save(), which merges them into the file.
+    """
+
+    def __init__(self, path):
+        # absolute, as locked() creates its directory
+        self.path = os.path.abspath(path)
+        self.entries = None
+        self.updates = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(data):
+        return hashlib.sha256(
+            json.dumps(data, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key):
+        with self.lock:
+            if self.entries is None:
+                self.entries = self.read()
+            if key in self.updates:
+                return self.updates[key]
+            return self.entries.get(key)
+
+    def set(self, key, entry):
+        """Record (or, with None, forget) the fingerprints of a test"""
+        with self.lock:
+            self.updates[key] = entry
+
+    def save(self):
+        import tempfile
+
+        with self.lock:
+            if not self.updates:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            with locked(self.path):
+                # other processes may have saved their tests meanwhile
+                entries = self.read()
+                for key, entry in self.updates.items():
+                    if entry is None:
+                        entries.pop(key, None)
+                    else:
+                        entries[key] = entry
+                with tempfile.NamedTemporaryFile(
+                    "w", dir=directory, delete=False, suffix=".tmp"
+                ) as f:
+                    json.dump(entries, f)
+                os.replace(f.name, self.path)
+            self.entries = entries
+            self.updates = {}
+
+
+class Record:
+    """A listed test: the fields we index on, plus the raw API record"""
+
+    __slots__ = ("id", "name", "website_url", "tags", "data")
+
+    def __init__(self, data):
+        self.id = str(data["id"])
+        self.name = data.get("name")
+        website_url = data.get("website_url")
+        self.website_url = website_url.rstrip("/") if website_url else None
+        self.tags = tuple(data.get("tags") or ())
+        self.data = data
+
+
+class Inventory:
+    """
+    The tests (or other records) of one listing, indexed by id, name,
+    website_url (without a trailing slash) and tag. Records are read from
+    `records` lazily, only as far as a lookup needs, so a listing can still
+    stop at the page holding the test looked for. Our own writes are applied
+    with replace(), keeping the indexes valid without listing again.
+    Iterating yields the raw API records, in listing order.
+    """
+
+    def __init__(self, records=()):
+        self.by_id = {}
+        # several tests may share a name or URL; the first listed wins
+        self.by_name = {}
+        self.by_url = {}
+        self.by_tag = {}
+        self.pending = iter(records)
+        self.lock = threading.RLock()
+
+    def add(self, data):
+        record = Record(data)
+        with self.lock:
+            if record.id in self.by_id:
+                self.discard(record.id)
+            self.by_id[record.id] = record
+            self.by_name.setdefault(record.name, []).append(record)
+            self.by_url.setdefault(record.website_url, []).append(record)
+            for tag in record.tags:
+                self.by_tag.setdefault(tag, {})[record.id] = record
+        return record
+
+    def discard(self, test_id):
+        with self.lock:
+            record = self.by_id.pop(str(test_id), None)
+            if record is None:
+                return
+            for index, key in (
+                (self.by_name, record.name),
+                (self.by_url, record.website_url),
+            ):
+                index[key].remove(record)
+                if not index[key]:
+                    del index[key]
+            for tag in record.tags:
+                del self.by_tag[tag][record.id]
+
+    def load(self, found=lambda: False):
+        """Index pending records until found() or the listing ends"""
+        with self.lock:
+            if found():
+                return
+            for data in self.pending:
+                self.add(data)
+                if found():
+                    return
+
+    def lookup(self, index, key):
+        with self.lock:
+            self.load(lambda: key in index)
+            matches = index.get(key)
+            return matches[0].data if matches else None
+
+    def get(self, test_id):
+        test_id = str(test_id)
+        with self.lock:
+            self.load(lambda: test_id in self.by_id)
+            record = self.by_id.get(test_id)
+            return record.data if record else None
+
+    def find_name(self, name):
+        return self.lookup(self.by_name, name)
+
+    def find_url(self, website_url):
+        return self.lookup(self.by_url, website_url.rstrip("/"))
+
+    def tagged(self, tag):
+        with self.lock:
+            self.load()
+            return [record.data for record in self.by_tag.get(tag, {}).values()]
+
+    def replace(self, test_id, data):
+        """Apply one of our own writes (None deletes)"""
+        test_id = str(test_id)
+        with self.lock:
+            # don't let a later load bring back the old version
+            self.load(lambda: test_id in self.by_id)
+            if data is None:
+                self.discard(test_id)
+            else:
+                self.add(dict(data, id=test_id))
+
+    def __iter__(self):
+        with self.lock:
+            self.load()
+            records = list(self.by_id.values())
+        return (record.data for record in records)
+
+    @classmethod
+    def of(cls, listing):
+        """An Inventory of listing, unless it already is one"""
+        return listing if isinstance(listing, cls) else cls(listing)
+
+    def __len__(self):
+        with self.lock:
+            self.load()
+            return len(self.by_id)
+
+
+class MemoryListingCache:
+    """
+    In-process counterpart of ListingCache, holding an Inventory of each
+    listing for as long as the process lives (or ttl seconds, if given).
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.listings = {}
+        self.lock = threading.RLock()
+
+    def get_or_fetch(self, api_key, endpoint, fetch):
+        with self.lock:
+            fetched_at, inventory = self.listings.get((api_key, endpoint), (0, None))
+            if inventory is not None and (
+                self.ttl is None or time.time() - fetched_at <= self.ttl
+            ):
+                return inventory
+            records = fetch()
+            if records is None:
+                return None
+            inventory = Inventory(records)
+            inventory.load()
+            self.listings[(api_key, endpoint)] = (time.time(), inventory)
+            return inventory
+
+    def invalidate(self, api_key, endpoint):
+        with self.lock:
+            self.listings.pop((api_key, endpoint), None)
+
+    def replace(self, api_key, endpoint, test_id, record):
+        """Apply one of our own writes to a cached listing (None deletes)"""
+        with self.lock:
+            if (api_key, endpoint) in self.listings:
+                self.listings[(api_key, endpoint)][1].replace(test_id, record)
+
+    # tests we create are kept as sent for the rest of the process
+    created = replace
 
 
 class StatusCakeAPI:
@@ -56,25 +761,117 @@ class StatusCakeAPI:
     # For exaple, tags=["prod", "myteam"] becomes tags[]=prod&tags[]=myteam
     # See: https://developers.statuscake.com/guides/api/parameters/
     LIST_PARAMETERS = set()
+    # API parameters StatusCake accepts but never returns, so can't be
+    # compared: a test that sets any is always updated (unless a journal shows
+    # it unchanged)
+    WRITE_ONLY_PARAMETERS = ("basic_password",)
+    # API parameters returned under a different name, as {request: response}
+    RESPONSE_FIELDS = {}
+    # Response fields holding lists whose order StatusCake doesn't preserve
+    SET_FIELDS = ()
+    # Response fields holding URLs, compared without a trailing slash
+    URL_FIELDS = ()
+    # Response fields returned by listings as well as by retrieve(), which
+    # fingerprint a test for the Journal
+    LISTED_FIELDS = ()
+
+    # A RateLimiter per API key (StatusCake limits each account separately),
+    # shared by every request for that key in the process, so concurrent
+    # tests are paced together rather than each hitting the limit on its own.
+    rate_limiters = {}
+    rate_limiters_lock = threading.Lock()
+    # Process-wide unless a RequestMetrics is passed to __init__
+    metrics = RequestMetrics()
+    MAX_RETRIES = 5
+    BACKOFF = 1.0
+    BACKOFF_MAX = 30.0
+    # 5xx responses are only retried for idempotent methods, since a failed
+    # POST may still have created the test.
+    RETRY_STATUSES = (500, 502, 503, 504)
 
-    def __init__(self, api_key, state, log_file=None, **kwargs) -> None:
+    base_url = "https://api.statuscake.com"
+    url = None
+    contact_groups_url = "/v1/contact-groups"
+    # Contact group ids by name, as {api_key: {name: id}}, listed once per
+    # process and shared by every test, and the API keys whose groups were
+    # listed again for a name that wasn't found (once is enough)
+    contact_group_ids = {}
+    contact_groups_refreshed = set()
+    contact_group_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api_key,
+        state,
+        log_file=None,
+        client=None,
+        cache=None,
+        check_mode=False,
+        metrics=None,
+        journal=None,
+        **kwargs,
+    ) -> None:
         self.api_key = api_key
+        self.rate_limiter = self.limiter_for(api_key)
+        if metrics is not None:
+            self.metrics = metrics
         self.state = state
+        # only plan the writes, reporting what would change
+        self.check_mode = check_mode
+        # an optional ListingCache of the test listings
+        self.cache = cache
+        # an optional Journal, to skip tests unchanged since last applied
+        self.journal = journal
         self.id = None
+        # the remote test, as found by the last listing or retrieve()
+        self.record = None
+        # the Inventory of tests at self.url, built by the first lookup
+        # unless a shared one is given (see BulkSync)
+        self.inventory = None
+        # retries needed by the last request
+        self.retries = 0
         self.config = self.prepare_data(kwargs)
-        self.client = requests.Session()
-        self.client.headers["Authorization"] = f"Bearer {self.api_key}"
+        # taken before apply() fills in defaults and contact group ids
+        self.config_fingerprint = Journal.fingerprint(self.config) if journal else None
+        # a requests.Session may be shared between instances (see BulkSync)
+        self._client = client
         self.status = Status()
         if log_file:
-            logging.basicConfig(
-                filename=log_file,
-                format="%(asctime)s %(name)-22s %(levelname)-8s %(message)s",
-                level=logging.DEBUG,
-            )
-            httpclient_logging_patch()
+            LogSink.open(log_file)
+
+    @staticmethod
+    def new_rate_limiter():
+        return RateLimiter()
+
+    @classmethod
+    def limiter_for(cls, api_key):
+        """The RateLimiter of an API key"""
+        with cls.rate_limiters_lock:
+            if api_key not in cls.rate_limiters:
+                cls.rate_limiters[api_key] = cls.new_rate_limiter()
+            return cls.rate_limiters[api_key]
+
+    @property
+    def client(self):
+        """The requests.Session, only created (and imported) once needed"""
+        if self._client is None:
+            self._client = self.new_client(self.api_key)
+        return self._client
+
+    @staticmethod
+    def new_client(api_key, pool_size=None):
+        import requests
+
+        client = requests.Session()
+        if pool_size:
+            # keep a connection per worker thread when sharing the session
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_size)
+            client.mount("https://", adapter)
+        client.headers["Authorization"] = f"Bearer {api_key}"
+        return client
 
     def full_url(self, path):
-        return f"https://api.statuscake.com{path}"
+        return f"{self.base_url}{path}"
 
     def prepare_data(self, data):
         cleaned_data = {}
@@ -95,25 +892,326 @@ class StatusCakeAPI:
 
     def _request(self, method, path, **kwargs):
         requests_method = getattr(self.client, method)
-        try:
-            logger.debug(f"Request data: {kwargs['data']}")
-        except KeyError:
-            pass
-        response = requests_method(self.full_url(path), **kwargs)
+        if "data" in kwargs:
+            logger.debug("Request data: %s", self.redacted(kwargs["data"]))
+        attempt = 0
+        started = time.monotonic()
+        while True:
+            self.rate_limiter.acquire()
+            response = requests_method(self.full_url(path), **kwargs)
+            self.rate_limiter.update(response.headers)
+            delay = self.retry_delay(method, response, attempt)
+            if delay is None:
+                break
+            attempt += 1
+            logger.warning(
+                "StatusCake answered %s to %s %s, retrying in %.1fs (%s/%s)",
+                response.status_code,
+                method.upper(),
+                path,
+                delay,
+                attempt,
+                self.MAX_RETRIES,
+            )
+            self.rate_limiter.backoff(delay)
+        self.retries = attempt
+        # latency covers the whole call, including pacing and retries
+        latency = time.monotonic() - started
+        self.metrics.record(
+            method, path, response.status_code, latency, len(response.content), attempt
+        )
+        logger.debug(
+            "%s %s: %s",
+            method.upper(),
+            path,
+            response.status_code,
+            extra={
+                "method": method.upper(),
+                "path": path,
+                "status": response.status_code,
+                "latency": round(latency, 4),
+                "bytes": len(response.content),
+                "retries": attempt,
+            },
+        )
         self.response = response
         if self.response.status_code < 200 or self.response.status_code >= 300:
             data = {"message": response.reason, "errors": ""}
             try:
                 data = self.response.json()
-            except requests.JSONDecodeError:
+            except ValueError:  # requests.JSONDecodeError
                 data["errors"] = response.headers
-            msg = f"StatusCake error: {data.get('message')} - {data.get('errors')} --- Request data: {kwargs.get('data')}"  # noqa
+            # results are reported outside Ansible too (the CLI), unmasked by
+            # no_log, so they get redacted data like the log
+            msg = f"StatusCake error: {data.get('message')} - {data.get('errors')} --- Request data: {self.redacted(kwargs.get('data'))}"  # noqa
             logger.error(msg)
             self.status.message = msg
             # mark as failed so error is sent to Ansible output
             self.status.success = False
         return response
 
+    def redacted(self, data):
+        """Request data with the values of write-only (secret) parameters masked"""
+        if not isinstance(data, dict):
+            return data
+        return {
+            key: "***" if key in self.WRITE_ONLY_PARAMETERS else val
+            for key, val in data.items()
+        }
+
+    def retry_delay(self, method, response, attempt):
+        """Seconds to wait before retrying a request, or None to give up"""
+        if attempt >= self.MAX_RETRIES:
+            return None
+        if response.status_code == 429:
+            retry_after = response.headers.get(
+                "Retry-After", response.headers.get("x-ratelimit-reset")
+            )
+            try:
+                return min(float(retry_after), self.BACKOFF_MAX)
+            except (TypeError, ValueError):
+                pass
+        elif response.status_code not in self.RETRY_STATUSES or method == "post":
+            return None
+        # exponential backoff with "equal jitter"
+        backoff = min(self.BACKOFF_MAX, self.BACKOFF * 2**attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    def desired_record(self):
+        """Map self.config (the request schema) onto the API's response schema"""
+        record = {}
+        for key, val in self.config.items():
+            if key.endswith("[]"):
+                key = key[:-2]
+            elif key.endswith("_csv"):
+                key, val = key[:-4], val.split(",")
+            if key in self.WRITE_ONLY_PARAMETERS:
+                continue
+            record[self.RESPONSE_FIELDS.get(key, key)] = val
+        return record
+
+    def changes(self, record):
+        """Field-level differences between the remote record and our config"""
+        return diff_fields(
+            record,
+            self.desired_record(),
+            set_fields=self.SET_FIELDS,
+            url_fields=self.URL_FIELDS,
+        )
+
+    def current_record(self):
+        """
+        The remote test. The record found while listing is reused when it
+        covers every field we manage; otherwise the full test is fetched.
+        """
+        if self.record is None or not set(self.desired_record()) <= set(self.record):
+            self.record = self.retrieve()
+            if self.record:
+                # keep the full test, so later lookups needn't fetch it again
+                self.remember(self.record)
+        return self.record
+
+    def plan(self, action, msg, diff):
+        """Report a write that check mode skips"""
+        self.status.success = True
+        self.status.changed = True
+        self.status.action = action
+        self.status.diff = diff
+        self.status.message = msg
+        logger.info(msg)
+
+    def put_changes(self, current):
+        """
+        Send an update only if the remote test differs from our config, or
+        our config sets write-only parameters, whose changes can't be seen
+        """
+        difference = self.changes(current)
+        write_only = [key for key in self.WRITE_ONLY_PARAMETERS if key in self.config]
+        if not difference and not write_only:
+            self.status.success = True
+            self.status.changed = False
+            self.status.action = "none"
+            self.status.message = ""
+            return
+        changes = ", ".join(
+            [
+                f"{key}: ({change['old']!r}, {change['new']!r})"
+                for key, change in difference.items()
+            ]
+            + [f"{key}: (write-only, always sent)" for key in write_only]
+        )
+        if self.check_mode:
+            return self.plan("update", f"Changes (old, new): {changes}", difference)
+        self._request("put", f"{self.url}/{self.id}", data=self.config)
+        if self.response.status_code == 204:
+            self.record = dict(current, **self.desired_record())
+            self.status.success = True
+            self.status.changed = True
+            self.status.action = "update"
+            self.status.diff = difference
+            self.remember(self.record)
+            msg = f"Changes (old, new): {changes}"
+            self.status.message = msg
+            logger.info(msg)
+
+    def created_diff(self):
+        return {
+            key: {"old": None, "new": val} for key, val in self.desired_record().items()
+        }
+
+    def deleted_diff(self):
+        return {
+            key: {"old": val, "new": None} for key, val in (self.record or {}).items()
+        }
+
+    def contact_groups(self, refresh=False):
+        """
+        The account's contact group ids by name, or None if they can't be
+        listed. Concurrent callers wait for a single listing, and refreshing
+        lists them again at most once per API key.
+        """
+        with self.contact_group_lock:
+            if refresh and self.api_key not in self.contact_groups_refreshed:
+                self.contact_groups_refreshed.add(self.api_key)
+                self.contact_group_ids.pop(self.api_key, None)
+                if self.cache:
+                    self.cache.invalidate(self.api_key, self.contact_groups_url)
+            if self.api_key not in self.contact_group_ids:
+                groups = {}
+                for group in self.iter_tests(self.contact_groups_url):
+                    groups.setdefault(group["name"], str(group["id"]))
+                if self.status.message:
+                    return None
+                self.contact_group_ids[self.api_key] = groups
+            return self.contact_group_ids[self.api_key]
+
+    def resolve_contact_groups(self):
+        """
+        Replace contact group names in our config with their ids. Returns
+        False (with a failed status) if a name can't be resolved.
+        """
+        groups = self.config.get("contact_groups[]")
+        names = [group for group in groups or () if not str(group).isdigit()]
+        if not names:
+            return True
+        ids = self.contact_groups()
+        if ids is not None and not set(names) <= set(ids):
+            # the group may be newer than our listing
+            ids = self.contact_groups(refresh=True)
+        if ids is None:
+            return False
+        unknown = [name for name in names if name not in ids]
+        if unknown:
+            msg = f"Unknown StatusCake contact groups: {', '.join(unknown)}"
+            logger.error(msg)
+            self.status.message = msg
+            self.status.success = False
+            return False
+        self.config["contact_groups[]"] = [ids.get(group, group) for group in groups]
+        return True
+
+    def fingerprints(self):
+        """
+        Journal fingerprints of our config and of the remote test's listed
+        fields, normalized so a listing and a retrieved test agree
+        """
+        remote = {}
+        for key in self.LISTED_FIELDS:
+            val = (self.record or {}).get(key)
+            if isinstance(val, (list, tuple)):
+                val = sorted(str(item) for item in val)
+            elif val is not None and not isinstance(val, bool):
+                val = str(val).rstrip("/") if key in self.URL_FIELDS else str(val)
+            remote[key] = val
+        return {
+            "config": self.config_fingerprint,
+            "remote": Journal.fingerprint(remote),
+        }
+
+    def journal_key(self):
+        return f"{self.url}/{self.id}"
+
+    def unchanged(self):
+        """
+        Whether the journal shows our config was applied to the test, and
+        the test hasn't been edited since (as far as its listing shows)
+        """
+        if not (self.journal and self.id and self.record):
+            return False
+        if self.journal.get(self.journal_key()) != self.fingerprints():
+            return False
+        self.status.success = True
+        self.status.changed = False
+        self.status.action = "none"
+        self.status.message = ""
+        logger.info("%s is unchanged since last applied", self.journal_key())
+        return True
+
+    def journal_applied(self):
+        """Record the outcome of apply() in the journal"""
+        if not self.journal or self.check_mode or not self.status.success:
+            return
+        if self.state == "present" and self.status.action in ("none", "update"):
+            self.journal.set(self.journal_key(), self.fingerprints())
+        elif self.id:
+            # created tests are fingerprinted once they've been listed
+            self.journal.set(self.journal_key(), None)
+
+    def listing(self, path=None, params=None):
+        """
+        Every test listed at path (self.url by default), filtered by the API
+        with params. With a cache, the whole listing is fetched once and
+        shared until it expires; otherwise pages are fetched lazily as it's
+        iterated, so callers can stop early.
+        """
+        path = path or self.url
+        if not self.cache:
+            return self.paginate(path, params)
+
+        def fetch():
+            records = list(self.paginate(path, params))
+            return None if self.status.message else records
+
+        endpoint = f"{path}?{urlencode(sorted(params.items()))}" if params else path
+        return self.cache.get_or_fetch(self.api_key, endpoint, fetch) or []
+
+    def iter_tests(self, path=None):
+        return iter(self.listing(path))
+
+    def get_inventory(self):
+        """The indexed tests at self.url, listed by the first lookup"""
+        if self.inventory is None:
+            self.inventory = Inventory.of(self.listing())
+        return self.inventory
+
+    def remember(self, record, created=False):
+        """Apply one of our own writes (None deletes) to the inventory and cache"""
+        if self.inventory is not None:
+            self.inventory.replace(self.id, record)
+        if self.cache:
+            update = self.cache.created if created else self.cache.replace
+            update(self.api_key, self.url, self.id, record)
+
+    def paginate(self, path, params=None, limit=100):
+        """
+        Yield every item of a paginated listing, fetching one page at a time
+        and following the "metadata" block of each response.
+        https://www.statuscake.com/api/v1/#section/Pagination
+        """
+        page = 1
+        while True:
+            query = dict(params or {}, page=page, limit=limit)
+            self._request("get", path, params=query)
+            if self.response.status_code != 200:
+                return
+            body = self.response.json()
+            logger.debug("Page %s of %s: %s tests", page, path, len(body["data"]))
+            yield from body["data"]
+            page_count = body.get("metadata", {}).get("page_count", page)
+            if page >= page_count:
+                return
+            page += 1
+
 
 class UptimeTest(StatusCakeAPI):
 
@@ -124,31 +1222,61 @@ class UptimeTest(StatusCakeAPI):
         "dns_ip",
         "tags",
     )
+    RESPONSE_FIELDS = {"dns_ip": "dns_ips"}
+    SET_FIELDS = ("contact_groups", "dns_ips", "regions", "status_codes", "tags")
+    LISTED_FIELDS = (
+        "name",
+        "website_url",
+        "test_type",
+        "check_rate",
+        "contact_groups",
+        "paused",
+        "tags",
+    )
 
     def fetch_all(self):
-        self._request("get", self.url, params={"page": 1, "limit": 100})
-        if self.response.status_code == 200:
-            logger.debug("All uptime checks in StatusCake: %s", self.response.json())
-            return self.response.json()["data"]
-        return []
+        """
+        Retrieve all uptime tests
+        https://www.statuscake.com/api/v1/#operation/list-uptime-tests
+        """
+        return list(self.iter_tests())
 
     def find_by_name(self):
-        for test in self.fetch_all():
-            if test["name"] == self.config["name"]:
-                logger.debug(f"Fetched data: {test}")
-                self.id = test["id"]
-                return test
+        test = self.get_inventory().find_name(self.config["name"])
+        if test:
+            logger.debug("Fetched data: %s", test)
+            self.id = test["id"]
+            self.record = test
+        return test
+
+    find = find_by_name
 
     def retrieve(self):
         """
         Rerieve an uptime test with an id
         https://www.statuscake.com/api/v1/#operation/get-uptime-test
         """
-        self.find_by_name()
+        if not self.id:
+            self.find_by_name()
         if self.id:
             self._request("get", f"{self.url}/{self.id}", data=self.config)
             if self.response.status_code == 200:
-                return self.response.json()["data"]
+                return self.with_regions(self.response.json()["data"])
+
+    @staticmethod
+    def with_regions(record):
+        """
+        The test with its "regions", as we send them: StatusCake returns
+        the servers of each region instead
+        """
+        if "servers" in record and "regions" not in record:
+            record = dict(
+                record,
+                regions=list(
+                    dict.fromkeys(server["region_code"] for server in record["servers"])
+                ),
+            )
+        return record
 
     def create(self):
         """
@@ -160,14 +1288,19 @@ class UptimeTest(StatusCakeAPI):
                 self.config["test_type"] = "HTTP"
             if "check_rate" not in self.config:
                 self.config["check_rate"] = 300
+            if self.check_mode:
+                msg = f"A new test for '{self.config['name']}' would be created."
+                return self.plan("create", msg, self.created_diff())
             # Convert all _csv arguments to expect lists rather than strings
             self._request("post", self.url, data=self.config)
             if self.response.status_code == 201:
                 self.id = int(self.response.json()["data"]["new_id"])
+                self.remember(self.desired_record(), created=True)
                 msg = f"A new test for '{self.config['name']}' was created."
                 logger.info(msg)
                 self.status.success = True
                 self.status.changed = True
+                self.status.action = "create"
                 self.status.message = msg
 
     def update(self):
@@ -178,51 +1311,68 @@ class UptimeTest(StatusCakeAPI):
         if self.id:
             # Website_url and test_type are immutable in Statuscake API
             # Notifies user if they attempt to change them
-            fetch_tests = self.retrieve()
-            if fetch_tests:
-                if fetch_tests["website_url"] != self.config[
-                    "website_url"
-                ] or fetch_tests["test_type"] != self.config.get("test_type", "HTTP"):
-                    self.status.success = False
-                    self.status.changed = False
-                    msg = f"You attempted to change {fetch_tests['name']}'s 'website_url' or 'test_type' - they are immutable. To successfuly change them, delete the current test and create a new uptime test with the new parameters."  # noqa
-                    logger.info(msg)
-                    self.status.message = msg
-                    return
-
-            self._request("put", f"{self.url}/{self.id}", data=self.config)
-            if self.response.status_code == 204:
-                fetch_updated_tests = self.retrieve()
-                difference = dic_difference(fetch_tests, fetch_updated_tests)
-                self.status.success = True
-                self.status.changed = bool(difference)
-                msg = f"Changes (old, new): {difference}" if difference else ""
+            current = self.current_record()
+            if not current:
+                return
+            immutable = diff_fields(
+                current,
+                {
+                    "website_url": self.config.get("website_url"),
+                    "test_type": self.config.get("test_type", "HTTP"),
+                },
+            )
+            if immutable:
+                self.status.success = False
+                self.status.changed = False
+                msg = f"You attempted to change {current['name']}'s 'website_url' or 'test_type' - they are immutable. To successfuly change them, delete the current test and create a new uptime test with the new parameters."  # noqa
+                logger.info(msg)
                 self.status.message = msg
-                if msg:
-                    logger.info(msg)
+                return
+            self.put_changes(current)
 
     def delete(self):
         """
         Delete an uptime test.
         https://www.statuscake.com/api/v1/#operation/delete-uptime-test
         """
-        if self.id:
-            self._request("delete", f"{self.url}/{self.id}")
-            if self.response.status_code == 204:
-                msg = f"The test for '{self.config['name']}' was deleted"
-                self.status.success = True
-                self.status.changed = True
-        else:
+        if not self.id:
             self.status.success = True
+            self.status.action = "none"
             msg = f"'{self.config['name']}' test not found for deletion"
+        elif self.check_mode:
+            msg = f"The test for '{self.config['name']}' would be deleted"
+            return self.plan("delete", msg, self.deleted_diff())
+        else:
+            self._request("delete", f"{self.url}/{self.id}")
+            if self.response.status_code != 204:
+                return
+            self.remember(None)
+            msg = f"The test for '{self.config['name']}' was deleted"
+            self.status.success = True
+            self.status.changed = True
+            self.status.action = "delete"
         logger.info(msg)
         self.status.message = msg
 
     def sync(self):
         self.find_by_name()
+        if self.status.message:
+            # the listing failed; don't risk creating a duplicate test
+            return self.status
+        self.apply()
+        if self.journal:
+            self.journal.save()
+        return self.status
+
+    def apply(self):
+        """Create, update or delete the test, once self.id has been looked up"""
         logger.info(
             f"Does '{self.config['name']}' exist in StatusCake? {bool(self.id)}."
         )
+        if self.state == "present" and self.unchanged():
+            return self.status
+        if self.state == "present" and not self.resolve_contact_groups():
+            return self.status
         if self.state == "present":
             if self.id:
                 self.update()
@@ -230,6 +1380,7 @@ class UptimeTest(StatusCakeAPI):
                 self.create()
         else:
             self.delete()
+        self.journal_applied()
         return self.status
 
 
@@ -237,26 +1388,37 @@ class SSLTest(StatusCakeAPI):
 
     url = "/v1/ssl"
     LIST_PARAMETERS = ("alert_at", "contact_groups")
+    SET_FIELDS = ("alert_at", "contact_groups")
+    URL_FIELDS = ("website_url",)
+    LISTED_FIELDS = (
+        "website_url",
+        "check_rate",
+        "contact_groups",
+        "alert_at",
+        "alert_reminder",
+        "alert_expiry",
+        "alert_broken",
+        "alert_mixed",
+        "paused",
+    )
 
     def fetch_all(self):
         """
         Retrieve all SSL tests
         https://www.statuscake.com/api/v1/#operation/list-ssl-tests
         """
-        self._request("get", self.url, params={"page": 1, "limit": 100})
-        if self.response.status_code == 200:
-            logger.debug("All SSL checks in StatusCake: %s", self.response.json())
-            return self.response.json()["data"]
-        return []
+        return list(self.iter_tests())
 
     def find_by_website_url(self):
         """Retrieve test using website_url"""
-        provided_url = self.config["website_url"]
-        for test in self.fetch_all():
-            if test["website_url"] == provided_url:
-                logger.debug(f"Fetched data: {test}")
-                self.id = test["id"]
-                return test
+        test = self.get_inventory().find_url(self.config["website_url"])
+        if test:
+            logger.debug("Fetched data: %s", test)
+            self.id = test["id"]
+            self.record = test
+        return test
+
+    find = find_by_website_url
 
     def prepare_data(self, data):
         data = super().prepare_data(data)
@@ -272,7 +1434,8 @@ class SSLTest(StatusCakeAPI):
         Rerieve an SSL test via its id.
         https://www.statuscake.com/api/v1/#operation/get-ssl-test
         """
-        self.find_by_website_url()
+        if not self.id:
+            self.find_by_website_url()
         if self.id:
             self._request("get", f"{self.url}/{self.id}", data=self.config)
             if self.response.status_code == 200:
@@ -294,14 +1457,19 @@ class SSLTest(StatusCakeAPI):
                 self.config["alert_broken"] = True
             if "alert_mixed" not in self.config:
                 self.config["alert_mixed"] = True
+            if self.check_mode:
+                msg = f"A new SSL test for '{self.config['website_url']}' would be created."
+                return self.plan("create", msg, self.created_diff())
             # All _csv parameters (CSV_PARAMETERS) are converted to expect lists rather than strings
             self._request("post", self.url, data=self.config)
             if self.response.status_code == 201:
                 self.id = int(self.response.json()["data"]["new_id"])
+                self.remember(self.desired_record(), created=True)
                 msg = f"A new SSL test for '{self.config['website_url']}' was created."
                 logger.info(msg)
                 self.status.success = True
                 self.status.changed = True
+                self.status.action = "create"
                 self.status.message = msg
 
     def update(self):
@@ -309,41 +1477,55 @@ class SSLTest(StatusCakeAPI):
         Update an existing SSL test
         https://www.statuscake.com/api/v1/#operation/update-ssl-test
         """
-        self.find_by_website_url()
+        if not self.id:
+            self.find_by_website_url()
         if self.id:
-            pre_update_tests = self.retrieve()
-            self._request("put", f"{self.url}/{self.id}", data=self.config)
-            if self.response.status_code == 204:
-                fetch_updated_tests = self.retrieve()
-                difference = dic_difference(pre_update_tests, fetch_updated_tests)
-                self.status.success = True
-                self.status.changed = bool(difference)
-                msg = f"Changes (old, new): {difference}" if difference else ""
-                self.status.message = msg
-                if msg:
-                    logger.info(msg)
+            current = self.current_record()
+            if current:
+                self.put_changes(current)
 
     def delete(self):
         """
         Delete a SSL test.
         https://www.statuscake.com/api/v1/#operation/delete-ssl-test
         """
-        if self.id:
-            self._request("delete", f"{self.url}/{self.id}")
-            if self.response.status_code == 204:
-                msg = f"The test for '{self.config['website_url']}' was deleted"
-                self.status.success = True
-                self.status.changed = True
-        else:
+        if not self.id:
             self.status.success = True
+            self.status.action = "none"
             msg = f"'{self.config['website_url']}' SSL test not found for deletion"
+        elif self.check_mode:
+            msg = f"The test for '{self.config['website_url']}' would be deleted"
+            return self.plan("delete", msg, self.deleted_diff())
+        else:
+            self._request("delete", f"{self.url}/{self.id}")
+            if self.response.status_code != 204:
+                return
+            self.remember(None)
+            msg = f"The test for '{self.config['website_url']}' was deleted"
+            self.status.success = True
+            self.status.changed = True
+            self.status.action = "delete"
         self.status.message = msg
 
     def sync(self):
         self.find_by_website_url()
+        if self.status.message:
+            # the listing failed; don't risk creating a duplicate test
+            return self.status
+        self.apply()
+        if self.journal:
+            self.journal.save()
+        return self.status
+
+    def apply(self):
+        """Create, update or delete the test, once self.id has been looked up"""
         logger.info(
             f"Does '{self.config['website_url']}' exist in StatusCake? {bool(self.id)}."
         )
+        if self.state == "present" and self.unchanged():
+            return self.status
+        if self.state == "present" and not self.resolve_contact_groups():
+            return self.status
         if self.state == "present":
             if self.id:
                 self.update()
@@ -351,40 +1533,5 @@ class SSLTest(StatusCakeAPI):
                 self.create()
         else:
             self.delete()
+        self.journal_applied()
         return self.status
-
-
-if __name__ == "__main__":
-    # argparse argument
-    parser = argparse.ArgumentParser(
-        description="change file if congfig.yml is not an argument"
-    )
-    parser.add_argument(
-        "--file",
-        metavar="file",
-        type=str,
-        default="config.yml",
-        help="enter filename if not using config.yml",
-    )
-    parser.add_argument(
-        "--verbose", action="store_true", help="increase output verbosity"
-    )
-    args = parser.parse_args()
-    parser_file = args.file
-
-    # Logging config
-    formatter = logging.Formatter("%(levelname)s %(asctime)s %(name)s %(message)s")
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
-
-    data_loaded = yaml.safe_load(open(parser_file, "r"))
-
-    for ssl_test in data_loaded["ssl_tests"]:
-        if ssl_test["website_url"]:
-            test = SSLTest(api_key=data_loaded["api_key"], **ssl_test)
-            print(test.sync())
-            # print(test.retrieve())
-            # print(test.create())
-            # print(test.find_by_website_url())
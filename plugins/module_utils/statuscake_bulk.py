@@ -0,0 +1,275 @@
+"""
+Syncing and reading many StatusCake tests with one listing per test type.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from .statuscake import (
+    Inventory,
+    RequestMetrics,
+    SSLTest,
+    Status,
+    StatusCakeAPI,
+    UptimeTest,
+    logger,
+    normalize,
+)
+
+
+class BulkSync:
+    """
+    Reconcile many uptime and SSL tests against a single listing of each
+    inventory, sharing one requests.Session between every test. Up to
+    `concurrency` independent API calls run at once, still paced by the
+    shared rate limiter.
+
+    Test types listed in prune_types are also pruned: their remote tests
+    that aren't declared (and, with prune_tag, are tagged with it) are
+    deleted, unless there are more than prune_max_deletions of them.
+
+    With a Journal, tests unchanged since they were last applied are
+    skipped, without fetching or comparing them.
+    """
+
+    TEST_TYPES = {"uptime": (UptimeTest, "name"), "ssl": (SSLTest, "website_url")}
+
+    def __init__(
+        self,
+        api_key,
+        uptime_tests=(),
+        ssl_tests=(),
+        log_file=None,
+        concurrency=1,
+        cache=None,
+        check_mode=False,
+        metrics=None,
+        prune_types=(),
+        prune_tag=None,
+        prune_max_deletions=None,
+        journal=None,
+    ):
+        self.api_key = api_key
+        self.metrics = metrics or RequestMetrics()
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        self.prune_types = prune_types
+        self.prune_tag = prune_tag
+        self.prune_max_deletions = prune_max_deletions
+        self.client = StatusCakeAPI.new_client(api_key, pool_size=self.concurrency)
+        self.options = {
+            "api_key": api_key,
+            "log_file": log_file,
+            "client": self.client,
+            "cache": cache,
+            "check_mode": check_mode,
+            "metrics": self.metrics,
+            "journal": journal,
+        }
+        self.tests = {
+            "uptime": [UptimeTest(**self.options, **test) for test in uptime_tests],
+            "ssl": [SSLTest(**self.options, **test) for test in ssl_tests],
+        }
+        self.orphans = {"uptime": [], "ssl": []}
+        # seconds spent applying each test, for reports
+        self.elapsed = {}
+
+    @property
+    def uptime_tests(self):
+        return self.tests["uptime"]
+
+    @property
+    def ssl_tests(self):
+        return self.tests["ssl"]
+
+    def map(self, func, items):
+        """Call func on every item, concurrently, returning results in order"""
+        if self.concurrency == 1 or len(items) < 2:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return list(pool.map(func, items))
+
+    def fetch_inventory(self, test_type):
+        """List every test of test_type once, into an Inventory"""
+        test_class, _ = self.TEST_TYPES[test_type]
+        lister = StatusCakeAPI(
+            api_key=self.api_key,
+            state=None,
+            client=self.client,
+            cache=self.cache,
+            metrics=self.metrics,
+        )
+        inventory = Inventory.of(lister.listing(test_class.url))
+        inventory.load()
+        return inventory, lister.status
+
+    def find_orphans(self, test_type, inventory):
+        """Remote tests that aren't declared, as tests to delete"""
+        test_class, key = self.TEST_TYPES[test_type]
+        url = key in test_class.URL_FIELDS
+        declared = {
+            normalize(test.config.get(key), "", url=url)
+            for test in self.tests[test_type]
+        }
+        orphans = []
+        records = inventory.tagged(self.prune_tag) if self.prune_tag else inventory
+        for record in records:
+            if normalize(record.get(key), "", url=url) in declared:
+                continue
+            orphan = test_class(state="absent", **{key: record[key]}, **self.options)
+            orphan.id = record["id"]
+            orphan.record = record
+            orphan.inventory = inventory
+            orphans.append(orphan)
+        return orphans
+
+    def reconcile(self):
+        test_types = [
+            test_type
+            for test_type in self.TEST_TYPES
+            if self.tests[test_type] or test_type in self.prune_types
+        ]
+        inventories = self.map(self.fetch_inventory, test_types)
+        pending = []
+        for test_type, (inventory, listing_status) in zip(test_types, inventories):
+            for test in self.tests[test_type]:
+                if listing_status.message:
+                    # the listing failed; don't risk creating duplicate tests
+                    test.status = replace(listing_status)
+                    continue
+                # every test shares the inventory, and keeps it current
+                test.inventory = inventory
+                test.find()
+                pending.append(test)
+            if test_type in self.prune_types and not listing_status.message:
+                self.orphans[test_type] = self.find_orphans(test_type, inventory)
+        orphans = self.orphans["uptime"] + self.orphans["ssl"]
+        if (
+            self.prune_max_deletions is not None
+            and len(orphans) > self.prune_max_deletions
+        ):
+            msg = f"Refusing to prune {len(orphans)} tests, more than the maximum of {self.prune_max_deletions}."  # noqa
+            logger.error(msg)
+            for orphan in orphans:
+                orphan.status = Status(success=False, action="delete", message=msg)
+        else:
+            pending.extend(orphans)
+        self.map(self.apply, pending)
+
+    def apply(self, test):
+        start = time.monotonic()
+        test.apply()
+        self.elapsed[test] = time.monotonic() - start
+
+    def sync(self):
+        """
+        Sync every test and return one result per test, in input order,
+        followed by one per pruned test.
+        """
+        self.reconcile()
+        if self.options["journal"]:
+            self.options["journal"].save()
+        logger.info("StatusCake requests: %s", self.metrics.summary())
+        logger.info(
+            "StatusCake pacing: %s", StatusCakeAPI.limiter_for(self.api_key).stats()
+        )
+        results = []
+        for pruned, groups in ((False, self.tests), (True, self.orphans)):
+            for test_type, tests in groups.items():
+                for test in tests:
+                    results.append(
+                        {
+                            "type": test_type,
+                            "name": test.config.get("name"),
+                            "website_url": test.config.get("website_url"),
+                            "state": test.state,
+                            "id": test.id,
+                            "pruned": pruned,
+                            "success": test.status.success,
+                            "elapsed": round(self.elapsed.get(test, 0.0), 3),
+                            **test.status.result(),
+                        }
+                    )
+        return results
+
+
+class AccountsSync:
+    """
+    Sync several StatusCake accounts at once, as {name: {"api_key": ...,
+    "uptime_tests": [...], "ssl_tests": [...]}}. Each account is a BulkSync
+    with its own requests.Session and, as StatusCake limits each API key
+    separately, its own rate limiter, so the accounts run in parallel and
+    the sync takes about as long as the largest of them.
+
+    Other options (concurrency, pruning, the journal...) apply to every
+    account, unless the account sets its own; pruning limits are counted
+    per account.
+    """
+
+    def __init__(self, accounts, **options):
+        self.syncs = {
+            name: BulkSync(**{**options, **account})
+            for name, account in accounts.items()
+        }
+
+    def metrics_summary(self):
+        """Request metrics of each account"""
+        return {name: bulk.metrics.summary() for name, bulk in self.syncs.items()}
+
+    def sync(self):
+        """
+        Sync every account and return the results of BulkSync.sync(), each
+        with its account's name, in the order of the accounts.
+        """
+        if len(self.syncs) < 2:
+            synced = {name: bulk.sync() for name, bulk in self.syncs.items()}
+        else:
+            with ThreadPoolExecutor(max_workers=len(self.syncs)) as pool:
+                futures = {
+                    name: pool.submit(bulk.sync) for name, bulk in self.syncs.items()
+                }
+                synced = {name: future.result() for name, future in futures.items()}
+        return [
+            {"account": name, **result}
+            for name, results in synced.items()
+            for result in results
+        ]
+
+
+def list_tests(
+    api_key,
+    test_types=("uptime", "ssl"),
+    tags=(),
+    client=None,
+    cache=None,
+    metrics=None,
+):
+    """
+    Read the account's tests of test_types, returning ({test_type: [record]},
+    Status). With tags, only tests carrying any of them are returned: uptime
+    listings are filtered by the API (and cached apart from the full
+    listing), and SSL listings, which the API can't filter, are filtered here.
+    """
+    lister = StatusCakeAPI(
+        api_key=api_key, state=None, client=client, cache=cache, metrics=metrics
+    )
+    tests = {}
+    for test_type in test_types:
+        test_class, _ = BulkSync.TEST_TYPES[test_type]
+        params = None
+        if tags and test_type == "uptime":
+            params = {"tags": ",".join(tags)}
+        inventory = Inventory.of(lister.listing(test_class.url, params))
+        if tags:
+            tagged = {record["id"] for tag in tags for record in inventory.tagged(tag)}
+            tests[test_type] = [
+                record for record in inventory if record["id"] in tagged
+            ]
+        else:
+            tests[test_type] = list(inventory)
+        if lister.status.message:
+            break
+    else:
+        lister.status.success = True
+    return tests, lister.status
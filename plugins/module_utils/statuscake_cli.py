@@ -0,0 +1,255 @@
+"""
+Sync StatusCake tests, or export uptime history, without Ansible:
+
+    python -m plugins.module_utils.statuscake_cli --help
+
+run from the root of the collection. Kept apart from statuscake.py so that
+the modules don't import argparse and yaml.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+
+import yaml
+
+from .statuscake import Journal, RequestMetrics, StatusCakeAPI, logger
+from .statuscake_bulk import AccountsSync, BulkSync, list_tests
+from .statuscake_export import EXPORT_FORMATS, UPTIME_EXPORTS, export_uptime, timestamp
+
+
+def load_tests(items):
+    """Tests from a config file list, present unless they say otherwise"""
+    return [dict({"state": "present"}, **item) for item in items or () if item]
+
+
+def load_account(config, prune=False):
+    """
+    BulkSync options for the api_key, uptime_tests and ssl_tests of a config
+    file (or of one of its accounts), pruning the test types it lists
+    """
+    return {
+        "api_key": config.get("api_key"),
+        "uptime_tests": load_tests(config.get("uptime_tests")),
+        "ssl_tests": load_tests(config.get("ssl_tests")),
+        "prune_types": [
+            test_type
+            for test_type in BulkSync.TEST_TYPES
+            if prune and f"{test_type}_tests" in config
+        ],
+    }
+
+
+def export_time(value):
+    """An --after or --before argument, as a Unix timestamp"""
+    try:
+        return timestamp(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def main(argv=None):
+    """
+    Sync the uptime_tests and ssl_tests of a YAML config file, without
+    Ansible, and print a JSON report. Exits non-zero if any test failed.
+    The export command streams uptime history, periods or alerts instead.
+    """
+    parser = argparse.ArgumentParser(
+        description="Sync StatusCake uptime and SSL tests from a YAML file"
+    )
+    parser.add_argument(
+        "--file",
+        metavar="file",
+        type=str,
+        default="config.yml",
+        help="YAML file with api_key, uptime_tests and ssl_tests, or with accounts"
+        " of them (config.yml)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="increase output verbosity"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=4, help="number of concurrent API calls"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="report changes without making them"
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="delete tests that aren't in the file (of the types it lists)",
+    )
+    parser.add_argument("--prune-tag", help="only prune tests tagged with this tag")
+    parser.add_argument(
+        "--prune-max-deletions",
+        type=int,
+        default=10,
+        help="prune nothing if more tests than this would be deleted (10)",
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="file",
+        help="skip tests unchanged since last applied, per this journal file",
+    )
+    parser.add_argument(
+        "--report", metavar="file", help="write the JSON report here, not stdout"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="{export}")
+    export_parser = subparsers.add_parser(
+        "export",
+        help="stream the history, periods or alerts of uptime tests, not sync",
+    )
+    export_parser.add_argument("kind", choices=sorted(UPTIME_EXPORTS))
+    export_parser.add_argument(
+        "--test-id",
+        action="append",
+        dest="test_ids",
+        help="uptime test to export (repeatable; all of them by default)",
+    )
+    export_parser.add_argument(
+        "--tag",
+        action="append",
+        dest="tags",
+        help="without --test-id, only export tests with this tag (repeatable)",
+    )
+    export_parser.add_argument(
+        "--after",
+        type=export_time,
+        help="only records after this ISO date or Unix timestamp",
+    )
+    export_parser.add_argument(
+        "--before",
+        type=export_time,
+        help="only records before this ISO date or Unix timestamp",
+    )
+    export_parser.add_argument(
+        "--format", choices=sorted(EXPORT_FORMATS), default="jsonl"
+    )
+    export_parser.add_argument(
+        "--output", metavar="file", help="write records here, not stdout"
+    )
+    args = parser.parse_args(argv)
+
+    # Logs go to stderr, keeping stdout for the report. The level is set on
+    # the handler, so a log_file still gets every record.
+    stderr = logging.StreamHandler(sys.stderr)
+    stderr.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    logging.basicConfig(
+        handlers=[stderr], format="%(levelname)s %(asctime)s %(name)s %(message)s"
+    )
+    logger.setLevel(logging.DEBUG)
+
+    if args.command == "export":
+        return export_main(args)
+    with open(args.file) as f:
+        config = yaml.safe_load(f) or {}
+    start = time.monotonic()
+    options = {
+        "log_file": config.get("log_file"),
+        "concurrency": args.jobs,
+        "check_mode": args.dry_run,
+        "prune_tag": args.prune_tag,
+        "prune_max_deletions": args.prune_max_deletions,
+        "journal": Journal(args.journal) if args.journal else None,
+    }
+    if config.get("accounts"):
+        bulk = AccountsSync(
+            {
+                name: load_account(account, args.prune)
+                for name, account in config["accounts"].items()
+            },
+            **options,
+        )
+        metrics_summary = bulk.metrics_summary
+    else:
+        account = load_account(config, args.prune)
+        account["api_key"] = account["api_key"] or os.environ.get(
+            "STATUSCAKE_API_KEY", ""
+        )
+        bulk = BulkSync(**account, **options)
+        metrics_summary = bulk.metrics.summary
+    results = bulk.sync()
+    for result in results:
+        result.pop("diff", None)
+    report = {
+        "dry_run": args.dry_run,
+        "elapsed": round(time.monotonic() - start, 3),
+        "summary": dict(
+            Counter(
+                "failed" if not r["success"] else r["action"] or "none" for r in results
+            ),
+            total=len(results),
+        ),
+        "results": results,
+        "metrics": metrics_summary(),
+    }
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0 if all(result["success"] for result in results) else 1
+
+
+def export_main(args):
+    """The export command of main()"""
+    config = {}
+    if os.path.exists(args.file):
+        with open(args.file) as f:
+            config = yaml.safe_load(f) or {}
+    api_key = config.get("api_key") or os.environ.get("STATUSCAKE_API_KEY", "")
+    start = time.monotonic()
+    metrics = RequestMetrics()
+    client = StatusCakeAPI.new_client(api_key, pool_size=args.jobs)
+    test_ids = args.test_ids
+    if not test_ids:
+        tests, status = list_tests(
+            api_key, ["uptime"], tags=args.tags or (), client=client, metrics=metrics
+        )
+        if not status.success:
+            logger.error(status.message)
+            return 1
+        test_ids = [test["id"] for test in tests["uptime"]]
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        results = export_uptime(
+            api_key,
+            args.kind,
+            test_ids,
+            out,
+            format=args.format,
+            after=args.after,
+            before=args.before,
+            concurrency=args.jobs,
+            client=client,
+            metrics=metrics,
+        )
+    finally:
+        if args.output:
+            out.close()
+    report = {
+        "elapsed": round(time.monotonic() - start, 3),
+        "records": sum(result["records"] for result in results),
+        "results": results,
+        "metrics": metrics.summary(),
+    }
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    logger.info(
+        "Exported %s %s records of %s tests in %ss",
+        report["records"],
+        args.kind,
+        len(results),
+        report["elapsed"],
+    )
+    return 0 if all(result["success"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
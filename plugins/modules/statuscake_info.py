@@ -0,0 +1,54 @@
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    CONNECTION_ARGUMENT_SPEC,
+    ListingCache,
+    LogSink,
+    RequestMetrics,
+)
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake_bulk import (
+    list_tests,
+)
+
+
+def main():
+    argument_spec = {
+        "test_types": {
+            "required": False,
+            "type": "list",
+            "elements": "str",
+            "choices": ["uptime", "ssl"],
+            "default": ["uptime", "ssl"],
+        },
+        "tags": {"required": False, "type": "list", "elements": "str", "default": []},
+        # reading needs no journal
+        **{
+            key: CONNECTION_ARGUMENT_SPEC[key]
+            for key in ("api_key", "log_file", "cache_ttl", "metrics_file")
+        },
+    }
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    if module.params["log_file"]:
+        LogSink.open(module.params["log_file"])
+    cache_ttl = module.params["cache_ttl"]
+    metrics = RequestMetrics(sink=module.params["metrics_file"])
+    tests, status = list_tests(
+        api_key=module.params["api_key"],
+        test_types=module.params["test_types"],
+        tags=module.params["tags"],
+        cache=ListingCache(cache_ttl) if cache_ttl else None,
+        metrics=metrics,
+    )
+    result = {
+        "changed": False,
+        "uptime_tests": tests.get("uptime", []),
+        "ssl_tests": tests.get("ssl", []),
+        "metrics": metrics.summary(),
+    }
+    if not status.success:
+        module.fail_json(msg=status.message, **result)
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
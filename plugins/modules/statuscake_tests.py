@@ -0,0 +1,158 @@
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    CONNECTION_ARGUMENT_SPEC,
+    SSL_TEST_ARGUMENT_SPEC,
+    UPTIME_TEST_ARGUMENT_SPEC,
+    Journal,
+    ListingCache,
+    RequestMetrics,
+)
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake_bulk import (
+    AccountsSync,
+    BulkSync,
+)
+
+
+def build_tests(module, items, test_type, argument_spec, defaults):
+    """
+    Merge each of the test items over the per-type defaults, keep the
+    options that apply to this test type and validate them like the
+    single-test modules would.
+    """
+    validator = ArgumentSpecValidator(argument_spec)
+    tests = []
+    for item in items:
+        if test_type not in item.get("test_types", module.params["test_types"]):
+            continue
+        merged = dict(defaults or {}, **item)
+        if merged.get("basic_password"):
+            # keep item passwords out of the module's invocation output
+            module.no_log_values.add(merged["basic_password"])
+        params = {
+            key: val
+            for key, val in merged.items()
+            if key in argument_spec and val not in (None, "")
+        }
+        result = validator.validate(params)
+        if result.error_messages:
+            label = item.get("name") or item.get("website_url")
+            module.fail_json(
+                msg=f"Invalid {test_type} test '{label}': "
+                + ", ".join(result.error_messages)
+            )
+        tests.append(result.validated_parameters)
+    return tests
+
+
+def build_account(module, api_key, items):
+    """BulkSync options for the tests of one account"""
+    return {
+        "api_key": api_key,
+        "metrics": RequestMetrics(sink=module.params["metrics_file"]),
+        "uptime_tests": build_tests(
+            module,
+            items,
+            "uptime",
+            UPTIME_TEST_ARGUMENT_SPEC,
+            module.params["uptime_defaults"],
+        ),
+        "ssl_tests": build_tests(
+            module, items, "ssl", SSL_TEST_ARGUMENT_SPEC, module.params["ssl_defaults"]
+        ),
+    }
+
+
+def label(result):
+    """How diffs name a test, and its account if there are several"""
+    name = result["name"] or result["website_url"]
+    return f"{result['account']}: {name}" if "account" in result else name
+
+
+def main():
+    argument_spec = {
+        "tests": {"required": False, "type": "list", "elements": "dict"},
+        # {name: {"api_key": ..., "tests": [...]}}, synced in parallel
+        "accounts": {"required": False, "type": "dict"},
+        "test_types": {
+            "required": False,
+            "type": "list",
+            "elements": "str",
+            "default": ["uptime", "ssl"],
+        },
+        "uptime_defaults": {"required": False, "type": "dict", "default": {}},
+        "ssl_defaults": {"required": False, "type": "dict", "default": {}},
+        "concurrency": {"required": False, "type": "int", "default": 4},
+        "prune": {"required": False, "type": "bool", "default": False},
+        "prune_tag": {"required": False, "type": "str"},
+        "prune_max_deletions": {"required": False, "type": "int", "default": 10},
+        **CONNECTION_ARGUMENT_SPEC,
+        # only needed for "tests"; each of the accounts has its own
+        "api_key": {"required": False, "type": "str", "no_log": True},
+    }
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        required_one_of=[("tests", "accounts")],
+        mutually_exclusive=[("tests", "accounts")],
+        required_by={"tests": "api_key"},
+    )
+    cache_ttl = module.params["cache_ttl"]
+    journal_file = module.params["journal_file"]
+    options = dict(
+        concurrency=module.params["concurrency"],
+        cache=ListingCache(cache_ttl) if cache_ttl else None,
+        check_mode=module.check_mode,
+        prune_types=module.params["test_types"] if module.params["prune"] else (),
+        prune_tag=module.params["prune_tag"] or None,
+        prune_max_deletions=module.params["prune_max_deletions"],
+        journal=Journal(journal_file) if journal_file else None,
+    )
+    if module.params["accounts"]:
+        accounts = {}
+        for name, account in module.params["accounts"].items():
+            if not (account or {}).get("api_key"):
+                module.fail_json(msg=f"Account '{name}' has no api_key")
+            # keep account keys out of the module's invocation output
+            module.no_log_values.add(account["api_key"])
+            accounts[name] = build_account(
+                module, account["api_key"], account.get("tests") or []
+            )
+        bulk = AccountsSync(accounts, **options)
+        metrics_summary = bulk.metrics_summary
+    else:
+        bulk = BulkSync(
+            **build_account(module, module.params["api_key"], module.params["tests"]),
+            **options,
+        )
+        metrics_summary = bulk.metrics.summary
+    results = bulk.sync()
+    changed = any(result["changed"] for result in results)
+    # one diff per changed test, shown by ansible-playbook --diff
+    diff = [
+        dict(
+            result.pop("diff"),
+            before_header=label(result),
+            after_header=label(result),
+        )
+        for result in results
+        if "diff" in result
+    ]
+    failed = [result for result in results if not result["success"]]
+    if failed:
+        module.fail_json(
+            # pruning refusals repeat one message per test; show it once
+            msg="; ".join(dict.fromkeys(result["msg"] for result in failed)),
+            changed=changed,
+            results=results,
+            diff=diff,
+            metrics=metrics_summary(),
+        )
+    module.exit_json(
+        changed=changed, results=results, diff=diff, metrics=metrics_summary()
+    )
+
+
+if __name__ == "__main__":
+    main()
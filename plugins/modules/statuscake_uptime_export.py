@@ -0,0 +1,96 @@
+from ansible.module_utils.basic import AnsibleModule
+
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    CONNECTION_ARGUMENT_SPEC,
+    LogSink,
+    RequestMetrics,
+    StatusCakeAPI,
+)
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake_bulk import (
+    list_tests,
+)
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake_export import (
+    EXPORT_FORMATS,
+    UPTIME_EXPORTS,
+    export_uptime,
+    timestamp,
+)
+
+
+def main():
+    argument_spec = {
+        "kind": {"required": True, "type": "str", "choices": sorted(UPTIME_EXPORTS)},
+        "dest": {"required": True, "type": "path"},
+        "format": {
+            "required": False,
+            "type": "str",
+            "choices": sorted(EXPORT_FORMATS),
+            "default": "jsonl",
+        },
+        "test_ids": {"required": False, "type": "list", "elements": "str"},
+        "tags": {"required": False, "type": "list", "elements": "str", "default": []},
+        "after": {"required": False, "type": "str"},
+        "before": {"required": False, "type": "str"},
+        "concurrency": {"required": False, "type": "int", "default": 4},
+        # history isn't cached or journaled
+        **{
+            key: CONNECTION_ARGUMENT_SPEC[key]
+            for key in ("api_key", "log_file", "metrics_file")
+        },
+    }
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    params = module.params
+    if params["log_file"]:
+        LogSink.open(params["log_file"])
+    for key in ("after", "before"):
+        try:
+            params[key] = timestamp(params[key])
+        except ValueError as e:
+            module.fail_json(msg=f"Invalid {key}: {e}")
+    metrics = RequestMetrics(sink=params["metrics_file"])
+    client = StatusCakeAPI.new_client(
+        params["api_key"], pool_size=params["concurrency"]
+    )
+    test_ids = params["test_ids"]
+    if not test_ids:
+        tests, status = list_tests(
+            params["api_key"],
+            ["uptime"],
+            tags=params["tags"],
+            client=client,
+            metrics=metrics,
+        )
+        if not status.success:
+            module.fail_json(msg=status.message, metrics=metrics.summary())
+        test_ids = [test["id"] for test in tests["uptime"]]
+    if module.check_mode:
+        module.exit_json(changed=True, test_ids=test_ids, metrics=metrics.summary())
+    # the records stream straight to dest, a page per test at a time
+    with open(params["dest"], "w", newline="") as out:
+        results = export_uptime(
+            params["api_key"],
+            params["kind"],
+            test_ids,
+            out,
+            format=params["format"],
+            after=params["after"],
+            before=params["before"],
+            concurrency=params["concurrency"],
+            client=client,
+            metrics=metrics,
+        )
+    summary = {
+        "changed": True,
+        "dest": params["dest"],
+        "records": sum(result["records"] for result in results),
+        "results": results,
+        "metrics": metrics.summary(),
+    }
+    failed = [result for result in results if not result["success"]]
+    if failed:
+        module.fail_json(msg="; ".join(result["msg"] for result in failed), **summary)
+    module.exit_json(**summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import threading
+
+from ansible.plugins.action import ActionBase
+
+from ansible_collections.caktus.hosting_services.plugins.module_utils.statuscake import (
+    CONNECTION_ARGUMENT_SPEC,
+    Journal,
+    ListingCache,
+    LogSink,
+    MemoryListingCache,
+    RequestMetrics,
+    StatusCakeAPI,
+)
+
+# Every loop item of a task runs in the same worker process, so these are
+# shared by all of them: one pooled HTTPS session per API key, and one
+# snapshot of each listing that our own writes keep up to date.
+_lock = threading.Lock()
+_clients = {}
+_snapshot = MemoryListingCache()
+
+
+def shared_client(api_key):
+    with _lock:
+        if api_key not in _clients:
+            _clients[api_key] = StatusCakeAPI.new_client(api_key)
+        return _clients[api_key]
+
+
+class StatusCakeAction(ActionBase):
+    """
+    Run a statuscake_* test module on the controller, instead of shipping
+    it to the target once per loop item.
+    """
+
+    TRANSFERS_FILES = False
+    test_class = None
+    argument_spec = None
+
+    def run(self, tmp=None, task_vars=None):
+        result = super().run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+        _, args = self.validate_argument_spec(
+            argument_spec={**self.argument_spec, **CONNECTION_ARGUMENT_SPEC}
+        )
+        cache_ttl = args["cache_ttl"]
+        # per loop item, unlike the shared session and snapshot
+        metrics = RequestMetrics(sink=args["metrics_file"])
+        test = self.test_class(
+            api_key=args["api_key"],
+            log_file=args["log_file"],
+            client=shared_client(args["api_key"]),
+            cache=ListingCache(cache_ttl) if cache_ttl else _snapshot,
+            check_mode=self._task.check_mode,
+            metrics=metrics,
+            journal=Journal(args["journal_file"]) if args["journal_file"] else None,
+            **{key: args[key] for key in self.argument_spec},
+        )
+        try:
+            status = test.sync()
+        finally:
+            # the worker exits without running atexit handlers
+            LogSink.close_all()
+        result.update(status.result(), metrics=metrics.summary())
+        if not status.success:
+            result["failed"] = True
+        return result
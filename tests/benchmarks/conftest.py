@@ -0,0 +1,22 @@
+import pytest
+
+from plugins.module_utils import statuscake
+from tests.fake_statuscake import FakeStatusCake
+
+
+@pytest.fixture(scope="session")
+def fake_server():
+    server = FakeStatusCake().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fake_statuscake(fake_server, monkeypatch):
+    """The local StatusCake stand-in, emptied and with default behaviour"""
+    fake_server.reset()
+    fake_server.latency = 0.0
+    fake_server.throttle_every = 0
+    monkeypatch.setattr(statuscake.StatusCakeAPI, "base_url", fake_server.url)
+    return fake_server
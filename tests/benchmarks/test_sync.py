@@ -0,0 +1,174 @@
+"""
+Sync benchmarks against the local StatusCake stand-in. Besides timing each
+sync, they fail if a sync needs more API calls than its budget. Request
+counts are saved as extra_info; see them with --benchmark-json.
+
+Syncing 1000 tests one at a time takes too long for every run, so those
+cases are marked slow: run them with "pytest -m slow".
+"""
+
+import math
+
+import pytest
+
+from plugins.module_utils import statuscake, statuscake_bulk
+
+SIZES = (10, 100, 1000)
+EACH_SIZES = (10, 100, pytest.param(1000, marks=pytest.mark.slow))
+# every 10th test differs from its remote counterpart and needs an update
+CHANGED_EVERY = 10
+PER_PAGE = 100
+
+
+def seed_uptime(server, count):
+    desired = []
+    for i in range(count):
+        config = {
+            "name": f"Site {i}",
+            "website_url": f"https://site{i}.example.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["prod"],
+        }
+        remote = dict(config, check_rate=60 if i % CHANGED_EVERY == 0 else 300)
+        server.add("uptime", **remote)
+        desired.append(dict(config, state="present"))
+    return desired
+
+
+def seed_ssl(server, count):
+    desired = []
+    for i in range(count):
+        config = {
+            "website_url": f"https://site{i}.example.com/",
+            "check_rate": 1800,
+            "alert_at": [28, 7, 1],
+            "alert_reminder": True,
+        }
+        remote = dict(config, check_rate=86400 if i % CHANGED_EVERY == 0 else 1800)
+        server.add("ssl", **remote)
+        desired.append(dict(config, state="present"))
+    return desired
+
+
+def changed(count):
+    return math.ceil(count / CHANGED_EVERY)
+
+
+def lookup_pages(count):
+    """Pages listed when each test looks itself up, stopping at its match"""
+    return sum(math.ceil((i + 1) / PER_PAGE) for i in range(count))
+
+
+def run(benchmark, server, seed, sync):
+    def setup():
+        server.reset()
+        return (seed(),), {}
+
+    benchmark.pedantic(sync, setup=setup, rounds=1, iterations=1)
+    benchmark.extra_info["requests"] = server.request_count
+    benchmark.extra_info["by_endpoint"] = dict(server.requests)
+    return server.request_count
+
+
+def sync_each(test_class):
+    def sync(tests):
+        for config in tests:
+            assert test_class(api_key="", **config).sync().success
+
+    return sync
+
+
+def bulk_sync(**options):
+    def sync(tests):
+        uptime_tests, ssl_tests = tests
+        results = statuscake_bulk.BulkSync(
+            api_key="", uptime_tests=uptime_tests, ssl_tests=ssl_tests, **options
+        ).sync()
+        assert all(result["success"] for result in results)
+
+    return sync
+
+
+@pytest.mark.parametrize("count", EACH_SIZES)
+def test_uptime_sync(benchmark, fake_statuscake, count):
+    requests = run(
+        benchmark,
+        fake_statuscake,
+        lambda: seed_uptime(fake_statuscake, count),
+        sync_each(statuscake.UptimeTest),
+    )
+    assert requests <= lookup_pages(count) + changed(count)
+    rates = {test["check_rate"] for test in fake_statuscake.stores["uptime"].values()}
+    assert rates == {300}
+
+
+@pytest.mark.parametrize("count", EACH_SIZES)
+def test_ssl_sync(benchmark, fake_statuscake, count):
+    requests = run(
+        benchmark,
+        fake_statuscake,
+        lambda: seed_ssl(fake_statuscake, count),
+        sync_each(statuscake.SSLTest),
+    )
+    assert requests <= lookup_pages(count) + changed(count)
+    rates = {test["check_rate"] for test in fake_statuscake.stores["ssl"].values()}
+    assert rates == {1800}
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_bulk_sync(benchmark, fake_statuscake, count):
+    requests = run(
+        benchmark,
+        fake_statuscake,
+        lambda: (seed_uptime(fake_statuscake, count), seed_ssl(fake_statuscake, count)),
+        bulk_sync(concurrency=8),
+    )
+    # one listing of each inventory, plus the updates
+    assert requests <= 2 * math.ceil(count / PER_PAGE) + 2 * changed(count)
+
+
+@pytest.mark.parametrize("count", SIZES)
+def test_bulk_sync_journal(benchmark, fake_statuscake, tmp_path, count):
+    path = str(tmp_path / "journal.json")
+
+    def seed():
+        tests = (seed_uptime(fake_statuscake, count), seed_ssl(fake_statuscake, count))
+        # a first run applies every test, and journals it
+        bulk_sync(journal=statuscake.Journal(path))(tests)
+        fake_statuscake.requests.clear()
+        return tests
+
+    requests = run(
+        benchmark,
+        fake_statuscake,
+        seed,
+        bulk_sync(concurrency=8, journal=statuscake.Journal(path)),
+    )
+    # steady state: just the listings
+    assert requests == 2 * math.ceil(count / PER_PAGE)
+
+
+@pytest.mark.parametrize("concurrency", (1, 8))
+def test_bulk_sync_latency(benchmark, fake_statuscake, concurrency):
+    fake_statuscake.latency = 0.005
+    run(
+        benchmark,
+        fake_statuscake,
+        lambda: (seed_uptime(fake_statuscake, 100), []),
+        bulk_sync(concurrency=concurrency),
+    )
+
+
+def test_bulk_sync_throttled(benchmark, fake_statuscake, rate_limiter):
+    fake_statuscake.throttle_every = 10
+    requests = run(
+        benchmark,
+        fake_statuscake,
+        lambda: (seed_uptime(fake_statuscake, 100), seed_ssl(fake_statuscake, 100)),
+        bulk_sync(concurrency=8),
+    )
+    budget = 2 * math.ceil(100 / PER_PAGE) + 2 * changed(100)
+    # every 10th call is answered with a 429 and retried
+    assert requests <= math.ceil(budget * 10 / 9) + 1
+    assert rate_limiter.retries > 0
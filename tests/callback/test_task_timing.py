@@ -0,0 +1,101 @@
+"""
+Run a playbook with the task_timing callback enabled, against a local
+connection inventory of two hosts.
+"""
+
+import csv
+import json
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).parents[2]
+
+PLAYBOOK = """
+- hosts: all
+  gather_facts: no
+  tasks:
+    - name: Loop
+      debug:
+        msg: "{{ item }}"
+      loop: [one, two]
+    - name: Retry
+      command: "true"
+      register: out
+      until: out.attempts | default(0) > 1
+      retries: 2
+      delay: 0
+"""
+
+
+@pytest.fixture
+def run_playbook(tmp_path):
+    # install the collection by linking it into a collections path
+    collections = tmp_path / "collections" / "ansible_collections" / "caktus"
+    collections.mkdir(parents=True)
+    (collections / "hosting_services").symlink_to(ROOT)
+    playbook = tmp_path / "playbook.yml"
+    playbook.write_text(PLAYBOOK)
+
+    def run(output):
+        env = dict(
+            os.environ,
+            ANSIBLE_COLLECTIONS_PATH=str(tmp_path / "collections"),
+            ANSIBLE_CALLBACKS_ENABLED="caktus.hosting_services.task_timing",
+            TASK_TIMING_OUTPUT=str(tmp_path / output),
+        )
+        subprocess.run(
+            [
+                "ansible-playbook",
+                "-i",
+                "a,b,",
+                "-c",
+                "local",
+                "-e",
+                f"ansible_python_interpreter={sys.executable}",
+                str(playbook),
+            ],
+            env=env,
+            capture_output=True,
+            check=True,
+        )
+        return tmp_path / output
+
+    return run
+
+
+class TestTaskTiming:
+    def test_json_report(self, run_playbook):
+        report = json.loads(run_playbook("timing.json").read_text())
+        timings = report["timings"]
+        assert sorted((t["host"], t["task"]) for t in timings) == [
+            ("a", "Loop"),
+            ("a", "Retry"),
+            ("b", "Loop"),
+            ("b", "Retry"),
+        ]
+        loop = next(t for t in timings if t["task"] == "Loop")
+        assert [item["item"] for item in loop["items"]] == ["one", "two"]
+        assert all(t["duration"] > 0 for t in timings)
+        assert report["roles"][""]["count"] == 4
+        assert report["roles"][""]["retries"] == 2
+        retry = next(t for t in report["tasks"] if t["task"] == "Retry")
+        assert (retry["count"], retry["retries"]) == (2, 2)
+        assert retry["p50"] <= retry["p95"] <= retry["max"]
+
+    def test_csv_report(self, run_playbook):
+        with open(run_playbook("timing.csv")) as f:
+            rows = list(csv.DictReader(f))
+        assert sorted((row["host"], row["task"], row["item"]) for row in rows) == [
+            ("a", "Loop", ""),
+            ("a", "Loop", "one"),
+            ("a", "Loop", "two"),
+            ("a", "Retry", ""),
+            ("b", "Loop", ""),
+            ("b", "Loop", "one"),
+            ("b", "Loop", "two"),
+            ("b", "Retry", ""),
+        ]
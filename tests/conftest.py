@@ -0,0 +1,29 @@
+import pytest
+
+from plugins.module_utils import statuscake
+
+
+def unpaced_limiter():
+    """An unpaced rate limiter that records waits instead of sleeping"""
+    limiter = statuscake.RateLimiter(rate=1_000_000, burst=1_000_000)
+    limiter.waits = []
+    limiter.sleep = limiter.waits.append
+    return limiter
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter(monkeypatch):
+    """One fresh, unpaced rate limiter for every API key"""
+    limiter = unpaced_limiter()
+    monkeypatch.setattr(statuscake.StatusCakeAPI, "rate_limiters", {})
+    monkeypatch.setattr(
+        statuscake.StatusCakeAPI, "new_rate_limiter", staticmethod(lambda: limiter)
+    )
+    return limiter
+
+
+@pytest.fixture(autouse=True)
+def contact_group_ids(monkeypatch):
+    """Forget contact groups listed by earlier tests"""
+    monkeypatch.setattr(statuscake.StatusCakeAPI, "contact_group_ids", {})
+    monkeypatch.setattr(statuscake.StatusCakeAPI, "contact_groups_refreshed", set())
@@ -0,0 +1,162 @@
+"""
+A local stand-in for the StatusCake API, serving in-memory uptime and SSL
+tests over HTTP so syncs can be measured end to end.
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# request parameters returned under a different name, as the API does
+RESPONSE_FIELDS = {"dns_ip": "dns_ips"}
+
+
+def decode_value(values):
+    value = values[0]
+    if value in ("True", "False"):
+        return value == "True"
+    if value.isdigit():
+        return int(value)
+    return value
+
+
+def decode_form(body):
+    """Turn a form-encoded create/update request into a response record"""
+    record = {}
+    for key, values in parse_qs(body, keep_blank_values=True).items():
+        if key.endswith("[]"):
+            key, value = key[:-2], [decode_value([val]) for val in values]
+        elif key.endswith("_csv"):
+            key, value = key[:-4], values[0].split(",")
+        else:
+            value = decode_value(values)
+        record[RESPONSE_FIELDS.get(key, key)] = value
+    return record
+
+
+class FakeStatusCake(ThreadingHTTPServer):
+    """
+    In-memory uptime and SSL stores with StatusCake's pagination, plus
+    configurable latency and 429 injection (every `throttle_every`th call).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, throttle_every=0):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stores = {"uptime": {}, "ssl": {}}
+            self.ids = itertools.count(1)
+            self.requests = Counter()
+            self.count = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def request_count(self):
+        return sum(self.requests.values())
+
+    def add(self, kind, **record):
+        with self.lock:
+            test_id = str(next(self.ids))
+            self.stores[kind][test_id] = dict(record, id=test_id)
+            return test_id
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately; don't let Nagle delay the body
+    disable_nagle_algorithm = True
+    route = re.compile(r"^/v1/(?P<kind>uptime|ssl)(?:/(?P<id>\d+))?$")
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, data=None, headers=None):
+        body = json.dumps(data).encode() if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, val in (headers or {}).items():
+            self.send_header(key, val)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self):
+        server = self.server
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        match = self.route.match(url.path)
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.count += 1
+            throttled = (
+                server.throttle_every and server.count % server.throttle_every == 0
+            )
+            template = re.sub(r"/\d+$", "/{id}", url.path)
+            server.requests[f"{self.command} {template}"] += 1
+        if throttled:
+            return self.reply(
+                429, {"message": "Too Many Requests"}, {"Retry-After": "0"}
+            )
+        if not match:
+            return self.reply(404, {"message": "Not found"})
+        store = server.stores[match["kind"]]
+        test_id = match["id"]
+        if test_id and test_id not in store:
+            return self.reply(404, {"message": "No such test"})
+        if self.command == "GET" and test_id:
+            return self.reply(200, {"data": store[test_id]})
+        if self.command == "GET":
+            query = parse_qs(url.query)
+            page = int(query.get("page", ["1"])[0])
+            limit = int(query.get("limit", ["25"])[0])
+            records = list(store.values())
+            start = (page - 1) * limit
+            return self.reply(
+                200,
+                {
+                    "data": records[start : start + limit],
+                    "metadata": {
+                        "page": page,
+                        "per_page": limit,
+                        "page_count": max(1, -(-len(records) // limit)),
+                        "total_count": len(records),
+                    },
+                },
+            )
+        if self.command == "POST" and not test_id:
+            new_id = server.add(match["kind"], **decode_form(body))
+            return self.reply(201, {"data": {"new_id": new_id}})
+        if self.command == "PUT" and test_id:
+            with server.lock:
+                store[test_id].update(decode_form(body))
+            return self.reply(204)
+        if self.command == "DELETE" and test_id:
+            with server.lock:
+                del store[test_id]
+            return self.reply(204)
+        return self.reply(405, {"message": "Method not allowed"})
+
+    do_GET = do_POST = do_PUT = do_DELETE = handle_request
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture
+def uptime_records():
+    return [
+        {"id": str(i), "name": f"Site {i}", "website_url": f"https://site{i}.com"}
+        for i in range(1, 251)
+    ]
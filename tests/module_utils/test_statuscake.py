@@ -1,4 +1,79 @@
-from plugins.module_utils import statuscake
+import json
+import pathlib
+import re
+import subprocess
+import sys
+import time
+
+import pytest
+
+from plugins.module_utils import statuscake, statuscake_bulk
+
+
+def paged_listing(records, per_page):
+    """Build a requests_mock callback serving records in StatusCake's page format."""
+    page_count = max(1, -(-len(records) // per_page))
+
+    def callback(request, context):
+        page = int(request.qs.get("page", ["1"])[0])
+        start = (page - 1) * per_page
+        return {
+            "data": records[start : start + per_page],
+            "metadata": {
+                "page": page,
+                "per_page": per_page,
+                "page_count": page_count,
+                "total_count": len(records),
+            },
+        }
+
+    return callback
+
+
+class TestDiffFields:
+    def test_no_difference_after_normalization(self):
+        current = {
+            "check_rate": 300,
+            "paused": False,
+            "follow_redirects": True,
+            "tags": ["web", "prod"],
+            "status_codes": ["500", "404"],
+            "website_url": "https://example.com",
+        }
+        desired = {
+            "check_rate": "300",
+            "paused": False,
+            "follow_redirects": "true",
+            "tags": ["prod", "web"],
+            "status_codes": ["404", "500"],
+            "website_url": "https://example.com/",
+        }
+        diff = statuscake.diff_fields(
+            current,
+            desired,
+            set_fields=("tags", "status_codes"),
+            url_fields=("website_url",),
+        )
+        assert diff == {}
+
+    def test_structured_difference(self):
+        diff = statuscake.diff_fields(
+            {"check_rate": 60, "tags": ["prod"], "find_string": "ok"},
+            {"check_rate": 300, "tags": ["prod", "web"], "find_string": "ok"},
+            set_fields=("tags",),
+        )
+        assert diff == {
+            "check_rate": {"old": 60, "new": 300},
+            "tags": {"old": ["prod"], "new": ["prod", "web"]},
+        }
+
+    def test_list_order_matters_outside_set_fields(self):
+        diff = statuscake.diff_fields({"regions": ["a", "b"]}, {"regions": ["b", "a"]})
+        assert list(diff) == ["regions"]
+
+    def test_missing_remote_field_differs(self):
+        diff = statuscake.diff_fields({}, {"find_string": "ok"})
+        assert diff == {"find_string": {"old": None, "new": "ok"}}
 
 
 class TestStatusCakeAPI:
@@ -8,12 +83,515 @@ class TestStatusCakeAPI:
         client._request("get", "/v1/uptime")
         assert "Too Many Requests" in client.status.message
 
+    def test_too_many_requests_retries(self, requests_mock, rate_limiter):
+        requests_mock.get(
+            "/v1/uptime",
+            [
+                {"status_code": 429, "headers": {"Retry-After": "3"}},
+                {"status_code": 200, "json": {"data": []}},
+            ],
+        )
+        client = statuscake.StatusCakeAPI(api_key="", state="")
+        response = client._request("get", "/v1/uptime")
+        assert response.status_code == 200
+        assert client.status.message == ""
+        assert client.retries == 1
+        assert rate_limiter.waits == [3.0]
+        assert rate_limiter.stats()["retries"] == 1
+
+    def test_too_many_requests_gives_up(self, requests_mock, rate_limiter):
+        requests_mock.get("/v1/uptime", status_code=429, reason="Too Many Requests")
+        client = statuscake.StatusCakeAPI(api_key="", state="")
+        client._request("get", "/v1/uptime")
+        assert requests_mock.call_count == client.MAX_RETRIES + 1
+        # exponential backoff, with jitter keeping each wait in [half, full]
+        for attempt, wait in enumerate(rate_limiter.waits):
+            assert (
+                client.BACKOFF * 2**attempt / 2 <= wait <= client.BACKOFF * 2**attempt
+            )
+
+    def test_server_error_retried_except_for_post(self, requests_mock):
+        requests_mock.get("/v1/uptime", [{"status_code": 503}, {"status_code": 200}])
+        requests_mock.post("/v1/uptime", status_code=503)
+        client = statuscake.StatusCakeAPI(api_key="", state="")
+        assert client._request("get", "/v1/uptime").status_code == 200
+        assert client._request("post", "/v1/uptime").status_code == 503
+        assert requests_mock.call_count == 3
+
+    def test_rate_limit_headers_pause_requests(self, requests_mock, rate_limiter):
+        requests_mock.get(
+            "/v1/uptime",
+            headers={"x-ratelimit-remaining": "0", "x-ratelimit-reset": "2"},
+        )
+        client = statuscake.StatusCakeAPI(api_key="", state="")
+        client._request("get", "/v1/uptime")
+        client._request("get", "/v1/uptime")
+        assert len(rate_limiter.waits) == 1
+        assert 1.5 < rate_limiter.waits[0] <= 2
+
     def test_failed_status_code_api_call(self, requests_mock):
         requests_mock.get("/v1/uptime", status_code=400, json={"message": "Bad Error"})
         client = statuscake.StatusCakeAPI(api_key="", state="")
         client._request("get", "/v1/uptime")
         assert "Bad Error" in client.status.message
 
+    def test_paginate_follows_metadata(self, requests_mock, uptime_records):
+        requests_mock.get("/v1/uptime", json=paged_listing(uptime_records, 100))
+        client = statuscake.StatusCakeAPI(api_key="", state="")
+        assert list(client.paginate("/v1/uptime")) == uptime_records
+        assert requests_mock.call_count == 3
+
+    def test_paginate_stops_on_error(self, requests_mock):
+        requests_mock.get("/v1/uptime", status_code=400, json={"message": "Bad"})
+        client = statuscake.StatusCakeAPI(api_key="", state="")
+        assert list(client.paginate("/v1/uptime")) == []
+        assert requests_mock.call_count == 1
+
+
+class TestImport:
+    # a fresh interpreter, compiling the module as Ansible does for every loop item
+    SCRIPT = """
+import sys, time
+start = time.perf_counter()
+from plugins.module_utils import statuscake
+elapsed = time.perf_counter() - start
+test = statuscake.UptimeTest(api_key="", state="present", name="A", tags=["x"])
+test.changes({"name": "A", "tags": ["y"]})
+print(elapsed)
+print(" ".join(sorted(set(sys.argv[1:]) & set(sys.modules))))
+"""
+    DEFERRED = (
+        "requests",
+        "urllib3",
+        "yaml",
+        "argparse",
+        "concurrent.futures",
+        "csv",
+        "logging.handlers",
+    )
+
+    def test_import_is_cheap(self):
+        out = subprocess.run(
+            [sys.executable, "-B", "-c", self.SCRIPT, *self.DEFERRED],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=pathlib.Path(__file__).parents[2],
+        ).stdout.splitlines()
+        # only what a test needs before its first request is imported
+        assert out[1] == ""
+        # typically ~30ms; generous, to only catch heavy imports creeping back
+        assert float(out[0]) < 0.25
+
+
+class TestRateLimiter:
+    def test_token_bucket_paces_bursts(self):
+        limiter = statuscake.RateLimiter(rate=2, burst=1)
+        limiter.waits = []
+        limiter.sleep = limiter.waits.append
+        for _ in range(3):
+            limiter.acquire()
+        assert [round(wait, 1) for wait in limiter.waits] == [0.5, 1.0]
+        assert limiter.stats()["throttled"] == 2
+
+    def test_limiter_per_api_key(self, monkeypatch):
+        monkeypatch.setattr(
+            statuscake.StatusCakeAPI,
+            "new_rate_limiter",
+            staticmethod(statuscake.RateLimiter),
+        )
+        first = statuscake.StatusCakeAPI(api_key="a", state=None).rate_limiter
+        assert statuscake.StatusCakeAPI(api_key="a", state=None).rate_limiter is first
+        assert (
+            statuscake.StatusCakeAPI(api_key="b", state=None).rate_limiter is not first
+        )
+
+
+class TestRequestMetrics:
+    def test_calls_recorded_by_endpoint(self, requests_mock, tmp_path):
+        requests_mock.get("/v1/uptime", json={"data": []})
+        requests_mock.get(re.compile(r"/v1/uptime/\d+"), json={"data": {}})
+        requests_mock.delete("/v1/uptime/7", status_code=404, json={"message": "No"})
+        metrics = statuscake.RequestMetrics(sink=str(tmp_path / "calls.jsonl"))
+        client = statuscake.StatusCakeAPI(api_key="", state="", metrics=metrics)
+        client._request("get", "/v1/uptime")
+        client._request("get", "/v1/uptime/1")
+        client._request("get", "/v1/uptime/2")
+        client._request("delete", "/v1/uptime/7")
+        summary = metrics.summary()
+        assert summary["calls"] == 4
+        assert summary["by_endpoint"] == {
+            "GET /v1/uptime": 1,
+            "GET /v1/uptime/{id}": 2,
+            "DELETE /v1/uptime/{id}": 1,
+        }
+        assert summary["by_status"] == {200: 3, 404: 1}
+        assert summary["bytes"] == sum(call["bytes"] for call in metrics.calls) > 0
+        lines = (tmp_path / "calls.jsonl").read_text().splitlines()
+        assert [json.loads(line)["path"] for line in lines] == [
+            "/v1/uptime",
+            "/v1/uptime/{id}",
+            "/v1/uptime/{id}",
+            "/v1/uptime/{id}",
+        ]
+
+    def test_percentiles(self):
+        metrics = statuscake.RequestMetrics()
+        for latency in range(1, 101):
+            metrics.record("get", "/v1/ssl", 200, latency, 0, 0)
+        summary = metrics.summary()
+        assert summary["latency_p50"] == 50
+        assert summary["latency_p95"] == 95
+        assert statuscake.RequestMetrics().summary()["latency_p50"] is None
+
+
+class TestLogSink:
+    def test_structured_redacted_records(self, requests_mock, tmp_path):
+        import http.client
+
+        requests_mock.post("/v1/uptime", status_code=201, json={"data": {"new_id": 1}})
+        requests_mock.put("/v1/uptime/1", status_code=400, json={"message": "Bad"})
+        log_file = tmp_path / "statuscake.log"
+        test = statuscake.UptimeTest(
+            api_key="secret-key",
+            state="present",
+            name="A",
+            basic_password="it's p,ss word",
+            log_file=str(log_file),
+        )
+        test.create()
+        test._request("put", "/v1/uptime/1", data=test.config)
+        statuscake.logger.debug("Sent %s", test.client.headers["Authorization"])
+        statuscake.LogSink.open(str(log_file)).close()
+        text = log_file.read_text()
+        assert "secret-key" not in text
+        assert "p,ss" not in text and "ss word" not in text
+        records = [json.loads(line) for line in text.splitlines()]
+        errors = [record for record in records if record["level"] == "ERROR"]
+        assert "'basic_password': '***'" in errors[0]["message"]
+        assert records[-1]["message"] == "Sent Bearer ***"
+        call = next(record for record in records if "status" in record)
+        assert (call["method"], call["path"], call["status"]) == (
+            "POST",
+            "/v1/uptime",
+            201,
+        )
+        # no process-wide wire logging
+        assert http.client.HTTPConnection.debuglevel == 0
+
+    def test_rotation(self, tmp_path):
+        sink = statuscake.LogSink(str(tmp_path / "statuscake.log"), max_bytes=1000)
+        for i in range(50):
+            statuscake.logger.info("Record %s", i)
+        sink.close()
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            "statuscake.log",
+            "statuscake.log.1",
+            "statuscake.log.2",
+            "statuscake.log.3",
+        ]
+        assert (tmp_path / "statuscake.log").stat().st_size <= 1000
+
+    def test_forked_worker(self, tmp_path):
+        import multiprocessing
+
+        log_file = str(tmp_path / "statuscake.log")
+        parent = statuscake.LogSink.open(log_file)
+
+        def worker():
+            # like an Ansible worker: forked, and ended with os._exit()
+            statuscake.LogSink.open(log_file)
+            for i in range(2000):
+                statuscake.logger.info("Record %s", i)
+            statuscake.LogSink.close_all()
+
+        process = multiprocessing.get_context("fork").Process(target=worker)
+        process.start()
+        process.join()
+        parent.close()
+        assert len((tmp_path / "statuscake.log").read_text().splitlines()) == 2000
+
+
+class TestListingCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return statuscake.ListingCache(ttl=60, directory=str(tmp_path))
+
+    def test_listing_fetched_once_across_instances(
+        self, requests_mock, uptime_records, cache
+    ):
+        listing = requests_mock.get(
+            "/v1/uptime", json=paged_listing(uptime_records, 100)
+        )
+        for name in ("Site 1", "Site 250"):
+            client = statuscake.UptimeTest(
+                api_key="key", state="", cache=cache, name=name
+            )
+            assert client.find_by_name()["name"] == name
+        assert listing.call_count == 3
+
+    def test_expired_listing_refetched(self, requests_mock, cache, monkeypatch):
+        listing = requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        client = statuscake.UptimeTest(api_key="key", state="", cache=cache)
+        client.fetch_all()
+        now = time.time()
+        monkeypatch.setattr(statuscake.time, "time", lambda: now + 61)
+        client.fetch_all()
+        assert listing.call_count == 2
+
+    def test_shared_directory_not_used(self, requests_mock, tmp_path):
+        listing = requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        directory = tmp_path / "shared"
+        directory.mkdir()
+        directory.chmod(0o777)
+        cache = statuscake.ListingCache(ttl=60, directory=str(directory))
+        for _ in range(2):
+            statuscake.UptimeTest(api_key="key", state="", cache=cache).fetch_all()
+        assert listing.call_count == 2
+        assert list(directory.iterdir()) == []
+
+    def test_private_user_cache_directory(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        cache = statuscake.ListingCache(ttl=60)
+        assert cache.directory == str(tmp_path / "ansible-statuscake")
+        assert cache.private
+        assert (tmp_path / "ansible-statuscake").stat().st_mode & 0o777 == 0o700
+
+    def test_failed_listing_not_cached(self, requests_mock, cache):
+        requests_mock.get("/v1/uptime", status_code=400, json={"message": "Bad"})
+        client = statuscake.UptimeTest(api_key="key", state="", cache=cache)
+        assert client.fetch_all() == []
+        assert cache.read(cache.path("key", "/v1/uptime")) is None
+
+    def test_file_named_by_hash(self, cache):
+        path = cache.path("secret-key", "/v1/uptime")
+        assert "secret-key" not in path
+        assert path != cache.path("other-key", "/v1/uptime")
+        assert path != cache.path("secret-key", "/v1/ssl")
+
+    def test_own_writes_update_cache(self, requests_mock, uptime_records, cache):
+        listing = requests_mock.get(
+            "/v1/uptime", json=paged_listing(uptime_records[:2], 100)
+        )
+        requests_mock.delete("/v1/uptime/1", status_code=204)
+        requests_mock.get(
+            "/v1/uptime/2",
+            json={"data": dict(uptime_records[1], test_type="HTTP", check_rate=60)},
+        )
+        requests_mock.put("/v1/uptime/2", status_code=204)
+        statuscake.UptimeTest(
+            api_key="key", state="absent", cache=cache, name="Site 1"
+        ).sync()
+        statuscake.UptimeTest(
+            api_key="key",
+            state="present",
+            cache=cache,
+            name="Site 2",
+            website_url="https://site2.com",
+            test_type="HTTP",
+            check_rate=300,
+        ).sync()
+        records = statuscake.UptimeTest(
+            api_key="key", state="", cache=cache
+        ).fetch_all()
+        assert listing.call_count == 1
+        assert records == [
+            {
+                "id": "2",
+                "name": "Site 2",
+                "website_url": "https://site2.com",
+                "test_type": "HTTP",
+                "check_rate": 300,
+            }
+        ]
+
+    def test_create_invalidates_cache(self, requests_mock, cache):
+        listing = requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        requests_mock.post(
+            "/v1/uptime", status_code=201, json={"data": {"new_id": "3"}}
+        )
+        statuscake.UptimeTest(
+            api_key="key", state="present", cache=cache, name="New"
+        ).sync()
+        statuscake.UptimeTest(api_key="key", state="", cache=cache).fetch_all()
+        assert listing.call_count == 2
+
+
+class TestInventory:
+    def test_lookups_load_only_as_far_as_needed(self, uptime_records):
+        listed = []
+
+        def records():
+            for record in uptime_records:
+                listed.append(record["id"])
+                yield record
+
+        inventory = statuscake.Inventory(records())
+        assert inventory.find_name("Site 3")["id"] == "3"
+        assert listed == ["1", "2", "3"]
+        assert inventory.get("2")["name"] == "Site 2"
+        assert len(listed) == 3
+        assert inventory.find_name("Missing") is None
+        assert len(inventory) == len(uptime_records)
+
+    def test_indexes(self):
+        inventory = statuscake.Inventory(
+            [
+                {"id": 1, "name": "A", "website_url": "https://a.com/", "tags": ["x"]},
+                {"id": "2", "name": "A", "website_url": "https://b.com", "tags": []},
+            ]
+        )
+        assert inventory.find_name("A")["id"] == 1
+        assert inventory.find_url("https://a.com")["id"] == 1
+        assert inventory.find_url("https://b.com/")["id"] == "2"
+        assert [test["id"] for test in inventory.tagged("x")] == [1]
+        assert inventory.tagged("y") == []
+
+    def test_replace_keeps_indexes_current(self):
+        inventory = statuscake.Inventory(
+            [{"id": "1", "name": "A", "tags": ["x"]}, {"id": "2", "name": "A"}]
+        )
+        inventory.replace("1", None)
+        assert inventory.find_name("A")["id"] == "2"
+        assert inventory.tagged("x") == []
+        inventory.replace("2", {"name": "B", "tags": ["x"]})
+        assert inventory.find_name("A") is None
+        assert inventory.find_name("B") == {"id": "2", "name": "B", "tags": ["x"]}
+        inventory.replace(3, {"name": "C"})
+        assert [test["id"] for test in inventory] == ["2", "3"]
+
+    def test_bulk_sync_keeps_shared_inventory_current(self, requests_mock):
+        requests_mock.get(
+            "/v1/uptime", json=paged_listing([{"id": "1", "name": "Old"}], 100)
+        )
+        requests_mock.delete("/v1/uptime/1", status_code=204)
+        requests_mock.post(
+            "/v1/uptime", status_code=201, json={"data": {"new_id": "2"}}
+        )
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[
+                {"state": "absent", "name": "Old"},
+                {"state": "present", "name": "New", "website_url": "https://new.com"},
+            ],
+        )
+        bulk.sync()
+        inventory = bulk.uptime_tests[0].inventory
+        assert inventory is bulk.uptime_tests[1].inventory
+        assert inventory.find_name("Old") is None
+        assert inventory.find_name("New")["website_url"] == "https://new.com"
+        assert requests_mock.call_count == 3
+
+
+class TestMemoryListingCache:
+    def test_snapshot_shared_and_kept_current(self, requests_mock, uptime_records):
+        listing = requests_mock.get(
+            "/v1/uptime", json=paged_listing(uptime_records[:3], 100)
+        )
+        requests_mock.delete("/v1/uptime/2", status_code=204)
+        snapshot = statuscake.MemoryListingCache()
+        client = statuscake.UptimeTest(api_key="key", state="", cache=snapshot)
+        session = client.client
+        for name in ("Site 1", "Site 2"):
+            statuscake.UptimeTest(
+                api_key="key", state="absent", client=session, cache=snapshot, name=name
+            ).find_by_name()
+        statuscake.UptimeTest(
+            api_key="key", state="absent", client=session, cache=snapshot, name="Site 2"
+        ).sync()
+        assert [test["id"] for test in client.fetch_all()] == ["1", "3"]
+        assert listing.call_count == 1
+
+
+class TestJournal:
+    listed = {
+        "id": "1",
+        "name": "Site",
+        "website_url": "https://site.com",
+        "test_type": "HTTP",
+        "check_rate": 60,
+        "tags": ["b", "a"],
+        "status": "up",
+    }
+
+    def sync(self, journal, **config):
+        config = {
+            "name": "Site",
+            "website_url": "https://site.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["a", "b"],
+            "find_string": "ok",
+            **config,
+        }
+        test = statuscake.UptimeTest(
+            api_key="", state="present", journal=journal, **config
+        )
+        return test.sync()
+
+    def serve(self, requests_mock, **changes):
+        """List the test (without find_string) and serve it in full"""
+        listed = dict(self.listed, **changes)
+        requests_mock.get("/v1/uptime", json=paged_listing([listed], 100))
+        requests_mock.get("/v1/uptime/1", json={"data": dict(listed, find_string="ok")})
+
+    def test_unchanged_test_skipped(self, requests_mock, tmp_path):
+        self.serve(requests_mock)
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        journal = statuscake.Journal(str(tmp_path / "journal.json"))
+        assert self.sync(journal).action == "update"
+        assert put.call_count == 1
+        # as StatusCake lists it after the update
+        self.serve(requests_mock, check_rate=300)
+        requests_mock.reset_mock()
+        for _ in range(2):
+            status = self.sync(statuscake.Journal(journal.path))
+            assert status.success and not status.changed
+        assert [r.path for r in requests_mock.request_history] == ["/v1/uptime"] * 2
+
+    def test_changes_not_skipped(self, requests_mock, tmp_path):
+        self.serve(requests_mock)
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        journal = statuscake.Journal(str(tmp_path / "journal.json"))
+        assert self.sync(journal, check_rate=60).action == "none"
+        # edited in StatusCake
+        self.serve(requests_mock, check_rate=30)
+        assert self.sync(journal, check_rate=60).action == "update"
+        # a new config
+        self.serve(requests_mock)
+        assert self.sync(journal, check_rate=120).action == "update"
+        assert put.call_count == 2
+
+    def test_save_merges_other_processes(self, tmp_path):
+        path = str(tmp_path / "journal.json")
+        first, second = statuscake.Journal(path), statuscake.Journal(path)
+        first.set("/v1/uptime/1", {"config": "a", "remote": "b"})
+        second.set("/v1/ssl/2", {"config": "c", "remote": "d"})
+        second.set("/v1/uptime/3", None)
+        first.save()
+        second.save()
+        assert set(statuscake.Journal(path).read()) == {"/v1/uptime/1", "/v1/ssl/2"}
+
+    def test_relative_path(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        journal = statuscake.Journal("journal.json")
+        journal.set("/v1/uptime/1", {"config": "a", "remote": "b"})
+        journal.save()
+        assert statuscake.Journal(str(tmp_path / "journal.json")).get(
+            "/v1/uptime/1"
+        ) == {"config": "a", "remote": "b"}
+
+    def test_deleted_tests_forgotten(self, requests_mock, tmp_path):
+        requests_mock.get("/v1/uptime", json=paged_listing([self.listed], 100))
+        requests_mock.delete("/v1/uptime/1", status_code=204)
+        journal = statuscake.Journal(str(tmp_path / "journal.json"))
+        journal.set("/v1/uptime/1", {"config": "a", "remote": "b"})
+        journal.save()
+        statuscake.UptimeTest(
+            api_key="", state="absent", journal=journal, name="Site"
+        ).sync()
+        assert statuscake.Journal(journal.path).read() == {}
+
 
 class TestUptimeTest:
     def test_contact_groups(self):
@@ -30,6 +608,165 @@ class TestUptimeTest:
         client = statuscake.UptimeTest(api_key="", state="", tags=["prod"])
         assert client.config == {"tags[]": ["prod"]}
 
+    def test_fetch_all_every_page(self, requests_mock, uptime_records):
+        requests_mock.get("/v1/uptime", json=paged_listing(uptime_records, 100))
+        client = statuscake.UptimeTest(api_key="", state="")
+        assert len(client.fetch_all()) == 250
+
+    def test_find_by_name_stops_at_match(self, requests_mock, uptime_records):
+        requests_mock.get("/v1/uptime", json=paged_listing(uptime_records, 100))
+        client = statuscake.UptimeTest(api_key="", state="", name="Site 150")
+        assert client.find_by_name()["id"] == "150"
+        assert client.id == "150"
+        assert requests_mock.call_count == 2
+
+    def test_sync_does_not_create_when_listing_fails(self, requests_mock):
+        requests_mock.get("/v1/uptime", status_code=400, json={"message": "Bad"})
+        post = requests_mock.post("/v1/uptime", status_code=201)
+        client = statuscake.UptimeTest(api_key="", state="present", name="Site")
+        status = client.sync()
+        assert not status.success
+        assert not post.called
+
+    def uptime_test(self, **kwargs):
+        config = {
+            "name": "Site",
+            "website_url": "https://site.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["prod", "web"],
+        }
+        config.update(kwargs)
+        return statuscake.UptimeTest(api_key="", state="present", **config)
+
+    def test_desired_record_uses_response_schema(self):
+        client = self.uptime_test(
+            status_codes=[200, 201], dns_ip=["1.1.1.1"], basic_password="secret"
+        )
+        assert client.desired_record() == {
+            "name": "Site",
+            "website_url": "https://site.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["prod", "web"],
+            "status_codes": ["200", "201"],
+            "dns_ips": ["1.1.1.1"],
+        }
+
+    def test_unchanged_update_skips_put(self, requests_mock):
+        record = {
+            "id": "1",
+            "name": "Site",
+            "website_url": "https://site.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["web", "prod"],
+        }
+        requests_mock.get("/v1/uptime", json=paged_listing([record], 100))
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        status = self.uptime_test().sync()
+        assert status.success and not status.changed
+        assert not put.called
+        assert requests_mock.call_count == 1
+
+    def test_changed_update_reports_local_diff(self, requests_mock):
+        record = {
+            "id": "1",
+            "name": "Site",
+            "website_url": "https://site.com",
+            "test_type": "HTTP",
+            "check_rate": 60,
+            "tags": ["prod", "web"],
+        }
+        requests_mock.get("/v1/uptime", json=paged_listing([record], 100))
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        status = self.uptime_test().sync()
+        assert status.success and status.changed
+        assert "check_rate" in status.message
+        assert status.diff == {"check_rate": {"old": 60, "new": 300}}
+        assert put.called
+        # one listing and one PUT; no re-fetch before or after the PUT
+        assert requests_mock.call_count == 2
+
+    def test_write_only_parameter_always_sent(self, requests_mock):
+        record = {
+            "id": "1",
+            "name": "Site",
+            "website_url": "https://site.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["web", "prod"],
+        }
+        requests_mock.get("/v1/uptime", json=paged_listing([record], 100))
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        status = self.uptime_test(basic_password="new-secret").sync()
+        assert status.success and status.changed
+        assert status.diff == {}
+        assert "basic_password: (write-only, always sent)" in status.message
+        assert put.last_request.text.count("basic_password=new-secret") == 1
+
+    def test_regions_compared_with_servers(self, requests_mock):
+        listed = {"id": "1", "name": "Site", "website_url": "https://site.com"}
+        requests_mock.get("/v1/uptime", json=paged_listing([listed], 100))
+        servers = [
+            {"region": "London", "region_code": "london", "status": "up"},
+            {"region": "London", "region_code": "london", "status": "up"},
+            {"region": "Paris", "region_code": "paris", "status": "up"},
+        ]
+        requests_mock.get(
+            "/v1/uptime/1",
+            json={
+                "data": dict(
+                    listed,
+                    test_type="HTTP",
+                    check_rate=300,
+                    tags=["prod", "web"],
+                    servers=servers,
+                )
+            },
+        )
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        status = self.uptime_test(regions=["paris", "london"]).sync()
+        assert status.success and not status.changed
+        status = self.uptime_test(regions=["paris", "tokyo"]).sync()
+        assert status.changed
+        assert status.diff == {
+            "regions": {"old": ["london", "paris"], "new": ["paris", "tokyo"]}
+        }
+        assert put.call_count == 1
+
+    def test_partial_listing_record_fetches_test_once(self, requests_mock):
+        listed = {"id": "1", "name": "Site", "website_url": "https://site.com"}
+        requests_mock.get("/v1/uptime", json=paged_listing([listed], 100))
+        get = requests_mock.get(
+            "/v1/uptime/1",
+            json={
+                "data": dict(
+                    listed, test_type="HTTP", check_rate=300, tags=["prod", "web"]
+                )
+            },
+        )
+        status = self.uptime_test().sync()
+        assert status.success and not status.changed
+        assert get.call_count == 1
+        assert requests_mock.call_count == 2
+
+    def test_immutable_website_url(self, requests_mock):
+        record = {
+            "id": "1",
+            "name": "Site",
+            "website_url": "https://other.com",
+            "test_type": "HTTP",
+            "check_rate": 300,
+            "tags": ["prod", "web"],
+        }
+        requests_mock.get("/v1/uptime", json=paged_listing([record], 100))
+        put = requests_mock.put("/v1/uptime/1", status_code=204)
+        status = self.uptime_test().sync()
+        assert not status.success
+        assert "immutable" in status.message
+        assert not put.called
+
 
 class TestSSLTest:
     def test_alert_at(self):
@@ -55,3 +792,162 @@ class TestSSLTest:
             "website_url": "https://example.com/",
             "contact_groups[]": [100000, 110000],
         }
+
+    def test_find_by_website_url_past_first_page(self, requests_mock):
+        records = [
+            {"id": str(i), "website_url": f"https://site{i}.com/"}
+            for i in range(1, 151)
+        ]
+        requests_mock.get("/v1/ssl", json=paged_listing(records, 100))
+        client = statuscake.SSLTest(
+            api_key="", state="", website_url="https://site120.com"
+        )
+        assert client.find_by_website_url()["id"] == "120"
+        assert requests_mock.call_count == 2
+
+    def test_unchanged_update_skips_put(self, requests_mock):
+        record = {
+            "id": "7",
+            "website_url": "https://example.com/",
+            "check_rate": 1800,
+            "alert_at": [1, 7, 28],
+        }
+        requests_mock.get("/v1/ssl", json=paged_listing([record], 100))
+        put = requests_mock.put("/v1/ssl/7", status_code=204)
+        status = statuscake.SSLTest(
+            api_key="",
+            state="present",
+            website_url="https://example.com",
+            check_rate=1800,
+            alert_at=[28, 7, 1],
+        ).sync()
+        assert status.success and not status.changed
+        assert not put.called
+        assert requests_mock.call_count == 1
+
+
+class TestContactGroups:
+    groups = [{"id": "11", "name": "Ops"}, {"id": "12", "name": "Devs"}]
+
+    def test_names_resolved_with_one_listing(self, requests_mock):
+        listing = requests_mock.get(
+            "/v1/contact-groups", json=paged_listing(self.groups, 100)
+        )
+        requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        post = requests_mock.post(
+            "/v1/uptime", status_code=201, json={"data": {"new_id": "1"}}
+        )
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[
+                {
+                    "state": "present",
+                    "name": f"Site {i}",
+                    "website_url": f"https://site{i}.com",
+                    "contact_groups": ["Ops", 12],
+                }
+                for i in range(20)
+            ],
+            concurrency=4,
+        )
+        assert all(r["success"] for r in bulk.sync())
+        assert listing.call_count == 1
+        assert post.call_count == 20
+        assert (
+            "contact_groups%5B%5D=11&contact_groups%5B%5D=12" in post.last_request.text
+        )
+
+    def test_ids_need_no_listing(self):
+        test = statuscake.UptimeTest(api_key="", state="present", contact_groups=[11])
+        assert test.resolve_contact_groups()
+        assert test.config["contact_groups[]"] == [11]
+
+    def test_unknown_name_relisted_once(self, requests_mock):
+        listing = requests_mock.get(
+            "/v1/contact-groups", json=paged_listing(self.groups, 100)
+        )
+        test = statuscake.SSLTest(
+            api_key="",
+            state="present",
+            website_url="https://a.com",
+            contact_groups=["Ops", "Nobody"],
+        )
+        assert not test.resolve_contact_groups()
+        assert listing.call_count == 2
+        assert test.status.message == "Unknown StatusCake contact groups: Nobody"
+        for _ in range(20):
+            test = statuscake.SSLTest(
+                api_key="",
+                state="present",
+                website_url="https://a.com",
+                contact_groups=["Nobody"],
+            )
+            assert not test.resolve_contact_groups()
+        assert listing.call_count == 2
+
+    def test_disk_cache(self, requests_mock, tmp_path):
+        listing = requests_mock.get(
+            "/v1/contact-groups", json=paged_listing(self.groups, 100)
+        )
+        cache = statuscake.ListingCache(ttl=60, directory=str(tmp_path))
+        for _ in range(2):
+            statuscake.StatusCakeAPI.contact_group_ids.clear()
+            test = statuscake.UptimeTest(
+                api_key="", state="present", cache=cache, contact_groups=["Devs"]
+            )
+            assert test.resolve_contact_groups()
+            assert test.config["contact_groups[]"] == ["12"]
+        assert listing.call_count == 1
+
+
+class TestCheckMode:
+    def test_plans_without_writing(self, requests_mock):
+        records = [
+            {
+                "id": "1",
+                "name": "Changed",
+                "website_url": "https://changed.com",
+                "test_type": "HTTP",
+                "check_rate": 60,
+            },
+            {"id": "2", "name": "Gone", "website_url": "https://gone.com"},
+        ]
+        requests_mock.get("/v1/uptime", json=paged_listing(records, 100))
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[
+                {
+                    "state": "present",
+                    "name": "Changed",
+                    "website_url": "https://changed.com",
+                    "check_rate": 300,
+                },
+                {"state": "absent", "name": "Gone"},
+                {"state": "present", "name": "New", "website_url": "https://new.com"},
+            ],
+            check_mode=True,
+        )
+        results = bulk.sync()
+        assert requests_mock.call_count == 1
+        assert all(r["success"] and r["changed"] for r in results)
+        assert [r["action"] for r in results] == ["update", "delete", "create"]
+        assert results[0]["changes"] == {"check_rate": {"old": 60, "new": 300}}
+        assert results[1]["changes"]["name"] == {"old": "Gone", "new": None}
+        assert results[2]["changes"]["website_url"] == {
+            "old": None,
+            "new": "https://new.com",
+        }
+        assert "would be created" in results[2]["msg"]
+
+    def test_result_diff(self):
+        status = statuscake.Status(
+            success=True,
+            changed=True,
+            action="update",
+            diff={"check_rate": {"old": 60, "new": 300}},
+        )
+        assert status.result()["diff"] == {
+            "before": {"check_rate": 60},
+            "after": {"check_rate": 300},
+        }
+        assert "diff" not in statuscake.Status(success=True).result()
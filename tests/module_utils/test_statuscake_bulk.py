@@ -0,0 +1,253 @@
+import threading
+import time
+
+from plugins.module_utils import statuscake, statuscake_bulk
+from tests.module_utils.test_statuscake import paged_listing
+
+
+class TestBulkSync:
+    def test_one_listing_per_test_type(self, requests_mock, uptime_records):
+        uptime_listing = requests_mock.get(
+            "/v1/uptime", json=paged_listing(uptime_records, 100)
+        )
+        ssl_listing = requests_mock.get(
+            "/v1/ssl",
+            json=paged_listing([{"id": "9", "website_url": "https://a.com/"}], 100),
+        )
+        requests_mock.post(
+            "/v1/uptime", status_code=201, json={"data": {"new_id": "500"}}
+        )
+        requests_mock.delete("/v1/uptime/200", status_code=204)
+        requests_mock.delete("/v1/uptime/3", status_code=204)
+        requests_mock.delete("/v1/ssl/9", status_code=204)
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[
+                {
+                    "state": "present",
+                    "name": "New site",
+                    "website_url": "https://new.com",
+                },
+                {"state": "absent", "name": "Site 200"},
+                {"state": "absent", "name": "Site 3"},
+            ],
+            ssl_tests=[{"state": "absent", "website_url": "https://a.com"}],
+        )
+        results = bulk.sync()
+        assert uptime_listing.call_count == 3
+        assert ssl_listing.call_count == 1
+        assert [(r["type"], r["id"], r["changed"]) for r in results] == [
+            ("uptime", 500, True),
+            ("uptime", "200", True),
+            ("uptime", "3", True),
+            ("ssl", "9", True),
+        ]
+        assert all(r["success"] for r in results)
+
+    def test_listing_failure_fails_every_test(self, requests_mock):
+        requests_mock.get("/v1/uptime", status_code=400, json={"message": "Bad"})
+        post = requests_mock.post("/v1/uptime", status_code=201)
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[
+                {"state": "present", "name": "A"},
+                {"state": "present", "name": "B"},
+            ],
+        )
+        results = bulk.sync()
+        assert not post.called
+        assert [r["success"] for r in results] == [False, False]
+        assert all("Bad" in r["msg"] for r in results)
+
+    def test_concurrent_sync_keeps_order(self, requests_mock, monkeypatch):
+        lock = threading.Lock()
+        running = {"now": 0, "max": 0}
+
+        # requests_mock serializes requests, so measure concurrency around
+        # delete() itself
+        def slow_delete(test):
+            with lock:
+                running["now"] += 1
+                running["max"] = max(running["max"], running["now"])
+            time.sleep(0.05)
+            with lock:
+                running["now"] -= 1
+            test.status.success = test.status.changed = True
+
+        records = [{"id": str(i), "name": f"Site {i}"} for i in range(8)]
+        requests_mock.get("/v1/uptime", json=paged_listing(records, 100))
+        monkeypatch.setattr(statuscake.UptimeTest, "delete", slow_delete)
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[{"state": "absent", "name": f"Site {i}"} for i in range(8)],
+            concurrency=4,
+        )
+        results = bulk.sync()
+        assert [r["id"] for r in results] == [str(i) for i in range(8)]
+        assert all(r["changed"] for r in results)
+        assert 1 < running["max"] <= 4
+
+    def test_prune_deletes_undeclared_tests(self, requests_mock):
+        requests_mock.get(
+            "/v1/uptime",
+            json=paged_listing(
+                [
+                    {
+                        "id": "1",
+                        "name": "Kept",
+                        "website_url": "https://kept.com",
+                        "test_type": "HTTP",
+                    },
+                    {"id": "2", "name": "Orphan", "tags": ["ansible"]},
+                    {"id": "3", "name": "Manual", "tags": ["other"]},
+                ],
+                100,
+            ),
+        )
+        requests_mock.get(
+            "/v1/ssl",
+            json=paged_listing(
+                [
+                    {"id": "7", "website_url": "https://kept.com/"},
+                    {"id": "8", "website_url": "https://old.com/", "tags": []},
+                ],
+                100,
+            ),
+        )
+        requests_mock.get(
+            "/v1/uptime/1",
+            json={
+                "data": {"id": "1", "name": "Kept", "website_url": "https://kept.com"}
+            },
+        )
+        delete = requests_mock.delete("/v1/uptime/2", status_code=204)
+        bulk = statuscake_bulk.BulkSync(
+            api_key="",
+            uptime_tests=[
+                {"state": "present", "name": "Kept", "website_url": "https://kept.com"}
+            ],
+            ssl_tests=[{"state": "present", "website_url": "https://kept.com"}],
+            prune_types=("uptime", "ssl"),
+            prune_tag="ansible",
+        )
+        results = bulk.sync()
+        assert delete.call_count == 1
+        assert [(r["id"], r["pruned"], r["action"]) for r in results] == [
+            ("1", False, "none"),
+            ("7", False, "none"),
+            ("2", True, "delete"),
+        ]
+        assert all(r["success"] for r in results)
+
+    def test_prune_refuses_too_many_deletions(self, requests_mock):
+        records = [{"id": str(i), "name": f"Site {i}"} for i in range(3)]
+        requests_mock.get("/v1/uptime", json=paged_listing(records, 100))
+        bulk = statuscake_bulk.BulkSync(
+            api_key="", prune_types=("uptime",), prune_max_deletions=2
+        )
+        results = bulk.sync()
+        assert requests_mock.call_count == 1
+        assert [r["pruned"] for r in results] == [True] * 3
+        assert not any(r["success"] for r in results)
+        assert "Refusing to prune 3 tests" in results[0]["msg"]
+
+    def test_prune_skipped_when_listing_fails(self, requests_mock):
+        requests_mock.get("/v1/uptime", status_code=400, json={"message": "Bad"})
+        bulk = statuscake_bulk.BulkSync(api_key="", prune_types=("uptime",))
+        assert bulk.sync() == []
+        assert requests_mock.call_count == 1
+
+
+class TestAccountsSync:
+    def test_accounts_synced_in_parallel(self, requests_mock):
+        for key, records in (("a", [{"id": "1", "name": "A"}]), ("b", [])):
+            requests_mock.get(
+                "/v1/uptime",
+                request_headers={"Authorization": f"Bearer {key}"},
+                json=paged_listing(records, 100),
+            )
+        requests_mock.delete("/v1/uptime/1", status_code=204)
+        requests_mock.post(
+            "/v1/uptime", status_code=201, json={"data": {"new_id": "2"}}
+        )
+        accounts = statuscake_bulk.AccountsSync(
+            {
+                "one": {
+                    "api_key": "a",
+                    "uptime_tests": [{"state": "absent", "name": "A"}],
+                },
+                "two": {
+                    "api_key": "b",
+                    "uptime_tests": [
+                        {
+                            "state": "present",
+                            "name": "B",
+                            "website_url": "https://b.com",
+                        }
+                    ],
+                },
+            },
+            concurrency=2,
+        )
+        one, two = accounts.syncs.values()
+        assert one.client is not two.client
+        results = accounts.sync()
+        assert [(r["account"], r["action"], r["id"]) for r in results] == [
+            ("one", "delete", "1"),
+            ("two", "create", 2),
+        ]
+        assert all(r["success"] for r in results)
+        post = [r for r in requests_mock.request_history if r.method == "POST"]
+        assert post[0].headers["Authorization"] == "Bearer b"
+        metrics = accounts.metrics_summary()
+        assert metrics["one"]["by_endpoint"] == {
+            "GET /v1/uptime": 1,
+            "DELETE /v1/uptime/{id}": 1,
+        }
+        assert metrics["two"]["by_endpoint"] == {
+            "GET /v1/uptime": 1,
+            "POST /v1/uptime": 1,
+        }
+
+
+class TestListTests:
+    records = [
+        {"id": "1", "name": "A", "tags": ["prod"]},
+        {"id": "2", "name": "B", "tags": ["staging"]},
+    ]
+
+    def test_tags_filtered_by_api(self, requests_mock):
+        listing = requests_mock.get(
+            "/v1/uptime", json=paged_listing(self.records[:1], 100)
+        )
+        tests, status = statuscake_bulk.list_tests(
+            api_key="", test_types=["uptime"], tags=["prod", "qa"]
+        )
+        assert status.success
+        assert tests == {"uptime": self.records[:1]}
+        assert listing.last_request.qs["tags"] == ["prod,qa"]
+
+    def test_cached_listing_filtered_by_api(self, requests_mock):
+        listing = requests_mock.get(
+            "/v1/uptime", json=paged_listing(self.records[1:], 100)
+        )
+        cache = statuscake.MemoryListingCache()
+        for _ in range(2):
+            tests, status = statuscake_bulk.list_tests(
+                api_key="", test_types=["uptime"], tags=["staging"], cache=cache
+            )
+        assert tests == {"uptime": self.records[1:]}
+        assert listing.call_count == 1
+        assert listing.last_request.qs["tags"] == ["staging"]
+        # the full listing is cached apart
+        statuscake_bulk.list_tests(api_key="", test_types=["uptime"], cache=cache)
+        assert listing.call_count == 2
+        assert "tags" not in listing.last_request.qs
+
+    def test_listing_failure(self, requests_mock):
+        requests_mock.get("/v1/uptime", status_code=401, json={"message": "No key"})
+        ssl = requests_mock.get("/v1/ssl", json=paged_listing([], 100))
+        tests, status = statuscake_bulk.list_tests(api_key="")
+        assert not status.success
+        assert "No key" in status.message
+        assert not ssl.called
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from plugins.module_utils import statuscake_cli
+from tests.module_utils.test_statuscake import paged_listing
+from tests.module_utils.test_statuscake_export import history_pages
+
+
+class TestMain:
+    def test_report(self, requests_mock, tmp_path, capsys):
+        config = tmp_path / "config.yml"
+        config.write_text(
+            "api_key: secret\n"
+            "uptime_tests:\n"
+            "  - name: New\n"
+            "    website_url: https://new.com\n"
+            "ssl_tests:\n"
+            "  - website_url: https://gone.com\n"
+            "    state: absent\n"
+        )
+        requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        requests_mock.get(
+            "/v1/ssl",
+            json=paged_listing(
+                [
+                    {"id": "8", "website_url": "https://gone.com/"},
+                    {"id": "9", "website_url": "https://orphan.com/"},
+                ],
+                100,
+            ),
+        )
+        assert statuscake_cli.main(["--file", str(config), "--dry-run", "--prune"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["dry_run"] is True
+        assert report["summary"] == {"create": 1, "delete": 2, "total": 3}
+        assert [(r["type"], r["action"], r["pruned"]) for r in report["results"]] == [
+            ("uptime", "create", False),
+            ("ssl", "delete", False),
+            ("ssl", "delete", True),
+        ]
+        assert report["metrics"]["calls"] == 2
+        assert requests_mock.call_count == 2
+
+    def test_accounts_report(self, requests_mock, tmp_path, capsys):
+        config = tmp_path / "config.yml"
+        config.write_text(
+            "accounts:\n"
+            "  one:\n"
+            "    api_key: a\n"
+            "    uptime_tests:\n"
+            "      - name: New\n"
+            "        website_url: https://new.com\n"
+            "  two:\n"
+            "    api_key: b\n"
+            "    ssl_tests: []\n"
+        )
+        requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        requests_mock.get(
+            "/v1/ssl",
+            json=paged_listing([{"id": "9", "website_url": "https://x/"}], 100),
+        )
+        assert statuscake_cli.main(["--file", str(config), "--dry-run", "--prune"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert [(r["account"], r["action"]) for r in report["results"]] == [
+            ("one", "create"),
+            ("two", "delete"),
+        ]
+        assert {name: m["calls"] for name, m in report["metrics"].items()} == {
+            "one": 1,
+            "two": 1,
+        }
+
+    def test_failure_exit_status(self, requests_mock, tmp_path):
+        config = tmp_path / "config.yml"
+        config.write_text("uptime_tests:\n  - name: A\n")
+        requests_mock.get("/v1/uptime", status_code=401, json={"message": "No key"})
+        report = tmp_path / "report.json"
+        assert (
+            statuscake_cli.main(["--file", str(config), "--report", str(report)]) == 1
+        )
+        assert json.loads(report.read_text())["summary"] == {"failed": 1, "total": 1}
+
+    def test_report_redacts_passwords(self, requests_mock, tmp_path):
+        config = tmp_path / "config.yml"
+        config.write_text(
+            "uptime_tests:\n"
+            "  - name: A\n"
+            "    website_url: https://a.com\n"
+            "    basic_password: hunter2\n"
+        )
+        requests_mock.get("/v1/uptime", json=paged_listing([], 100))
+        requests_mock.post("/v1/uptime", status_code=400, json={"message": "Bad"})
+        report = tmp_path / "report.json"
+        assert (
+            statuscake_cli.main(["--file", str(config), "--report", str(report)]) == 1
+        )
+        (result,) = json.loads(report.read_text())["results"]
+        assert "'basic_password': '***'" in result["msg"]
+        assert "hunter2" not in report.read_text()
+
+    def test_export(self, requests_mock, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        requests_mock.get("/v1/uptime", json=paged_listing([{"id": "7"}], 100))
+        requests_mock.get("/v1/uptime/7/periods", json=history_pages)
+        assert statuscake_cli.main(["export", "periods", "--output", "out.jsonl"]) == 0
+        lines = (tmp_path / "out.jsonl").read_text().splitlines()
+        assert [json.loads(line)["created_at"] for line in lines] == [
+            500,
+            400,
+            300,
+            200,
+            100,
+        ]
+
+    def test_export_invalid_date(self, capsys):
+        with pytest.raises(SystemExit) as exit:
+            statuscake_cli.main(["export", "periods", "--after", "September"])
+        assert exit.value.code == 2
+        assert "Not an ISO 8601 date" in capsys.readouterr().err
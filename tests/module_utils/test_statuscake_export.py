@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+from plugins.module_utils import statuscake_export
+
+
+def history_pages(request, context):
+    """Cursor-paginated history of 5 checks, newest first, 2 per page"""
+    before = int(request.qs.get("before", ["1000"])[0])
+    after = int(request.qs.get("after", ["0"])[0])
+    times = [t for t in (500, 400, 300, 200, 100) if after < t < before]
+    page = times[: int(request.qs["limit"][0])]
+    links = {"self": request.url}
+    if len(times) > len(page):
+        links["next"] = f"{request.url.split('?')[0]}?before={page[-1]}&limit=2"
+    return {
+        "data": [{"created_at": t, "status_code": 200, "location": "UK"} for t in page],
+        "links": links,
+    }
+
+
+class TestExport:
+    def test_cursor_pages_streamed(self, requests_mock):
+        listing = requests_mock.get("/v1/uptime/7/history", json=history_pages)
+        history = statuscake_export.UptimeHistory(api_key="", test_id=7)
+        records = iter(history.cursor(history.url, limit=2))
+        next(records)
+        assert listing.call_count == 1
+        assert [r["created_at"] for r in records] == [400, 300, 200, 100]
+        assert listing.call_count == 3
+
+    def test_time_window(self, requests_mock):
+        requests_mock.get("/v1/uptime/7/history", json=history_pages)
+        history = statuscake_export.UptimeHistory(
+            api_key="", test_id=7, after="1970-01-01T00:02:30", before=450
+        )
+        assert [r["created_at"] for r in history] == [400, 300, 200]
+        assert requests_mock.last_request.qs["after"] == ["150"]
+        assert all(r["test_id"] == "7" for r in history)
+
+    def test_time_window_pages(self, requests_mock):
+        listing = requests_mock.get("/v1/uptime/7/history", json=history_pages)
+        history = statuscake_export.UptimeHistory(
+            api_key="", test_id=7, after=150, before=450
+        )
+        records = list(history.cursor(history.url, {"after": 150, "before": 450}, 2))
+        assert [r["created_at"] for r in records] == [400, 300, 200]
+        assert listing.call_count == 2
+        assert listing.last_request.qs == {
+            "after": ["150"],
+            "before": ["300"],
+            "limit": ["2"],
+        }
+
+    def test_export_csv(self, requests_mock):
+        for test_id in range(1, 6):
+            requests_mock.get(f"/v1/uptime/{test_id}/history", json=history_pages)
+        out = io.StringIO()
+        results = statuscake_export.export_uptime(
+            "", "history", [1, 2, 3, 4, 5], out, format="csv", concurrency=3
+        )
+        assert [r["test_id"] for r in results] == ["1", "2", "3", "4", "5"]
+        assert all(r["success"] and r["records"] == 5 for r in results)
+        lines = out.getvalue().splitlines()
+        assert lines[0] == "test_id,created_at,status_code,location,performance"
+        assert len(lines) == 26
+        assert "3,300,200,UK," in lines
+
+    def test_export_failure(self, requests_mock):
+        requests_mock.get(
+            "/v1/uptime/1/alerts", status_code=404, json={"message": "No"}
+        )
+        out = io.StringIO()
+        [result] = statuscake_export.export_uptime("", "alerts", ["1"], out)
+        assert not result["success"]
+        assert result["records"] == 0
+        assert out.getvalue() == ""
+
+    def test_timestamp(self):
+        assert statuscake_export.timestamp(None) is None
+        assert statuscake_export.timestamp("1700000000") == 1700000000
+        assert statuscake_export.timestamp("2026-09-01") == 1788220800
+        assert statuscake_export.timestamp("2026-09-01T02:00:00+02:00") == 1788220800
+        assert statuscake_export.timestamp("2026-09-01T00:00:00Z") == 1788220800
+        with pytest.raises(ValueError, match="Not an ISO 8601 date"):
+            statuscake_export.timestamp("September")